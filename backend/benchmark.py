@@ -0,0 +1,234 @@
+"""
+Hot-path latency benchmarks for the FastAPI backend.
+
+Drives `fastapi_backend.app` in-process through an ASGI client against a
+throwaway SQLite database, so no server, network or Firebase project is needed.
+Run from the backend directory:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --compare bench.json     # later, on another commit
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# The backend reads its configuration at import time; everything it writes stays in BENCH_DIR
+BENCH_DIR = tempfile.mkdtemp(prefix="shortly-bench-")
+atexit.register(shutil.rmtree, BENCH_DIR, ignore_errors=True)
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(BENCH_DIR, "bench.db")
+os.environ["INVALIDATION_DIR"] = os.path.join(BENCH_DIR, "invalidation")
+os.environ.setdefault("REDIRECT_CACHE_SIZE", "10000000")
+
+import httpx  # noqa: E402
+
+import fastapi_backend  # noqa: E402
+from fastapi_backend import app, code_allocator, new_url_record, redirect_cache, storage  # noqa: E402
+
+BENCH_USER = "bench_user"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed):
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def drive(make_request, total, concurrency):
+    """Runs `total` requests from `concurrency` concurrent clients and returns latency stats."""
+    latencies = []
+    remaining = total
+
+    async def client_loop():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await make_request()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def populate(user_id, count):
+    """Inserts `count` links for `user_id` directly through the storage layer."""
+    codes = []
+    for start in range(0, count, 1000):
+        batch = await code_allocator.next_codes(min(1000, count - start))
+        created_at = datetime.now(timezone.utc).isoformat()
+        records = [new_url_record(f"https://example.com/{user_id}/{code}", user_id, code, created_at)
+                   for code in batch]
+        await storage.create_many(records)
+        codes.extend(batch)
+    return codes
+
+
+async def bench_redirect(client, codes, hit_ratio, concurrency, total):
+    # Warm every code, then force a miss for a `1 - hit_ratio` share of requests by evicting the code first
+    for code in codes:
+        redirect_cache.put(code, f"https://example.com/{code}")
+    before = redirect_cache.stats()
+
+    async def request():
+        code = random.choice(codes)
+        if random.random() >= hit_ratio:
+            redirect_cache.invalidate(code)
+        response = await client.get(f"/r/{code}")
+        assert response.status_code == 307, response.status_code
+
+    result = await drive(request, total, concurrency)
+    after = redirect_cache.stats()
+    lookups = (after["hits"] - before["hits"]) + (after["misses"] - before["misses"])
+    result["measured_hit_ratio"] = (after["hits"] - before["hits"]) / lookups if lookups else 0.0
+    return result
+
+
+async def bench_shorten(client, concurrency, total):
+    counter = 0
+
+    async def request():
+        nonlocal counter
+        counter += 1
+        response = await client.post("/api/shorten", json={
+            "original_url": f"https://example.com/new/{counter}", "user_id": "bench_writer"})
+        assert response.status_code == 200, response.text
+
+    return await drive(request, total, concurrency)
+
+
+async def bench_list(client, user_id, concurrency, total, limit):
+    async def request():
+        response = await client.get(f"/api/urls/{user_id}", params={"limit": limit})
+        assert response.status_code == 200, response.text
+
+    return await drive(request, total, concurrency)
+
+
+async def run(args):
+    results = []
+    await app.router.startup()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in args.sizes:
+                user_id = f"{BENCH_USER}_{size}"
+                codes = await populate(user_id, size)
+
+                for hit_ratio in args.hit_ratios:
+                    for concurrency in args.concurrency:
+                        stats = await bench_redirect(client, codes, hit_ratio, concurrency, args.requests)
+                        results.append({"route": "/r/{short_code}", "dataset_size": size,
+                                         "hit_ratio": hit_ratio, "concurrency": concurrency, **stats})
+                        report(results[-1])
+
+                for concurrency in args.concurrency:
+                    stats = await bench_list(client, user_id, concurrency, args.requests, args.page_size)
+                    results.append({"route": "/api/urls/{user_id}", "dataset_size": size,
+                                    "page_size": args.page_size, "concurrency": concurrency, **stats})
+                    report(results[-1])
+
+            for concurrency in args.concurrency:
+                stats = await bench_shorten(client, concurrency, args.requests)
+                results.append({"route": "/api/shorten", "concurrency": concurrency, **stats})
+                report(results[-1])
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+def scenario_key(result):
+    return tuple((key, result.get(key)) for key in ("route", "dataset_size", "hit_ratio", "page_size", "concurrency"))
+
+
+def report(result):
+    labels = " ".join(f"{key}={value}" for key, value in scenario_key(result) if value is not None)
+    print(f"{labels:<75} {result['rps']:>9.0f} req/s  p50 {result['p50_ms']:.3f} ms  "
+          f"p95 {result['p95_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
+
+
+def compare(results, baseline_path):
+    """Prints the relative change of every scenario against a previous run."""
+    with open(baseline_path) as f:
+        baseline = {scenario_key(result): result for result in json.load(f)["results"]}
+
+    print(f"\nChange vs {baseline_path} (negative latency / positive req/s is better):")
+    for result in results:
+        previous = baseline.get(scenario_key(result))
+        if not previous:
+            continue
+        deltas = []
+        for metric in ("rps", "p50_ms", "p99_ms"):
+            if previous[metric]:
+                deltas.append(f"{metric} {100 * (result[metric] - previous[metric]) / previous[metric]:+.1f}%")
+        labels = " ".join(f"{key}={value}" for key, value in scenario_key(result) if value is not None)
+        print(f"{labels:<75} {'  '.join(deltas)}")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the shortener's hot paths in-process.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Links per user.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--hit-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9, 1.0])
+    parser.add_argument("--page-size", type=int, default=100, help="limit for /api/urls/{user_id}.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Previous JSON results to compare against.")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    results = asyncio.run(run(args))
+
+    document = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "storage": fastapi_backend.STORAGE_BACKEND,
+        "config": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+
+class ClickBuffer:
+    """
+    Write-behind aggregation of redirect clicks.
+
+    `add()` only bumps an in-memory counter, so the redirect response never waits
+    on storage. A background task hands the accumulated per-code increments to
+    `flush_fn` every `flush_interval` seconds, or as soon as `max_pending` clicks
+    are buffered. If `flush_fn` raises, whatever is left in the dict it was given
+    is merged back and retried on the next interval, so it should pop codes it
+    has already written.
+    """
+
+    def __init__(self, flush_fn: Callable[[Dict[str, int]], Awaitable[None]], flush_interval: float = 1.0,
+                 max_pending: int = 1000):
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, int] = {}
+        self._pending_total = 0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = None
+
+    def add(self, short_code: str, count: int = 1):
+        self._pending[short_code] = self._pending.get(short_code, 0) + count
+        previous_total = self._pending_total
+        self._pending_total += count
+        # Wake only on crossing the threshold: after a failed flush the total stays above it,
+        # and waking on every click would retry a failing flush_fn without any delay
+        if previous_total < self.max_pending <= self._pending_total:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return self._pending_total
+
+    async def flush(self):
+        """Writes out everything buffered so far."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            counts, self._pending = self._pending, {}
+            self._pending_total = 0
+            try:
+                await self.flush_fn(counts)
+            except Exception as e:
+                print(f"Click flush failed, retrying later ({len(counts)} codes): {e}")
+                for code, count in counts.items():
+                    self._pending[code] = self._pending.get(code, 0) + count
+                    self._pending_total += count
+
+    def start(self):
+        """Starts the background flusher on the running event loop."""
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stops the background flusher and drains the remaining increments."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
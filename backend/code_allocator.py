@@ -0,0 +1,79 @@
+import asyncio
+import string
+from typing import Awaitable, Callable, List, Protocol
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+
+def base62_encode(number: int, length: int = 0) -> str:
+    """Encodes a non-negative integer in base62, left-padded with '0' to `length`."""
+    if number < 0:
+        raise ValueError("number must be non-negative")
+    chars = []
+    while number:
+        number, rem = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[rem])
+    return "".join(reversed(chars)).rjust(max(length, 1), BASE62_ALPHABET[0])
+
+
+class CodeAllocator(Protocol):
+    """Interface for short code allocation engines."""
+
+    async def next_code(self) -> str:
+        ...
+
+    async def next_codes(self, count: int) -> List[str]:
+        """Returns `count` fresh codes, ideally in a single round trip to storage."""
+        ...
+
+
+class RangeLeaseAllocator:
+    """
+    Hands out collision-free short codes from leased blocks of a global counter.
+
+    `lease_fn(n)` is a coroutine that atomically reserves `n` consecutive ids and
+    returns the first one; each worker process then serves `block_size` codes from
+    memory before it needs another round trip. Ids are spread over the fixed-length code space with
+    an affine permutation modulo 62**length, which is a bijection, so distinct ids
+    can never map to the same code and consecutive links don't get guessable codes.
+    """
+
+    # Coprime with 62 (odd and not a multiple of 31), so the permutation is invertible
+    MULTIPLIER = 35_742_549_199
+    OFFSET = 1_234_567_891
+
+    def __init__(self, lease_fn: Callable[[int], Awaitable[int]], block_size: int = 1000, length: int = 6):
+        self.lease_fn = lease_fn
+        self.block_size = block_size
+        self.length = length
+        self.space = 62 ** length
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def _next_ids(self, count: int) -> List[int]:
+        async with self._lock:
+            ids = list(range(self._next, min(self._end, self._next + count)))
+            self._next += len(ids)
+            missing = count - len(ids)
+            if missing:
+                # Lease everything still needed in one round trip, rounded up to whole blocks
+                size = -(-missing // self.block_size) * self.block_size
+                start = await self.lease_fn(size)
+                ids.extend(range(start, start + missing))
+                self._next, self._end = start + missing, start + size
+        if ids[-1] >= self.space:
+            raise RuntimeError(f"Short code space of length {self.length} is exhausted")
+        return ids
+
+    def _encode(self, value: int) -> str:
+        scrambled = (value * self.MULTIPLIER + self.OFFSET) % self.space
+        return base62_encode(scrambled, self.length)
+
+    async def next_code(self) -> str:
+        return self._encode((await self._next_ids(1))[0])
+
+    async def next_codes(self, count: int) -> List[str]:
+        if count <= 0:
+            return []
+        return [self._encode(value) for value in await self._next_ids(count)]
@@ -0,0 +1,114 @@
+import asyncio
+import heapq
+import re
+import time
+from typing import Awaitable, Callable, List, Optional
+
+# Lifetimes accepted by parse_expiration(), e.g. "7 days", "12 hours", "1 week"
+EXPIRATION_PATTERN = re.compile(r"^\s*(\d+)\s*(minute|hour|day|week)s?\s*$", re.IGNORECASE)
+UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400, "week": 604800}
+
+
+def parse_expiration(expiration: Optional[str]) -> Optional[int]:
+    """
+    Converts a lifetime such as "30 days" into seconds. None, "" and "Never" mean
+    the link never expires and give None. Raises ValueError for anything else.
+    """
+    if expiration is None or expiration.strip().lower() in ("", "never"):
+        return None
+    match = EXPIRATION_PATTERN.match(expiration)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid expiration: {expiration!r}.")
+    return int(match.group(1)) * UNIT_SECONDS[match.group(2).lower()]
+
+
+class ExpirationSweeper:
+    """
+    Removes expired links from storage and from every worker's redirect caches.
+
+    Deadlines of links this worker created or resolved are kept in a min-heap of
+    (expires_at, short_code), so the sweeper sleeps exactly until the next one is
+    due instead of polling. A full sweep also runs every `interval` seconds to
+    catch links scheduled by other workers or before a restart. A sweep deletes
+    every due link through storage's expires_at index, `batch_size` per call, and
+    hands the removed codes to `on_expired` in one go.
+    """
+
+    def __init__(self, delete_expired: Callable[[int, int], Awaitable[List[str]]],
+                 on_expired: Callable[[List[str]], None], interval: float = 60.0, batch_size: int = 500,
+                 max_scheduled: int = 100_000, clock=time.time):
+        self.delete_expired = delete_expired
+        self.on_expired = on_expired
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_scheduled = max_scheduled
+        self._clock = clock
+        self._heap = []
+        self._scheduled = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.removed = 0
+
+    def schedule(self, short_code: str, expires_at: int):
+        """Arranges for a sweep when `expires_at` (Unix seconds) passes."""
+        if short_code in self._scheduled or len(self._heap) >= self.max_scheduled:
+            # Beyond the bound, the periodic sweep still removes the link
+            return
+        self._scheduled.add(short_code)
+        heapq.heappush(self._heap, (expires_at, short_code))
+        if self._heap[0][1] == short_code:
+            self._wakeup.set()
+
+    async def sweep(self) -> int:
+        """Deletes every link that has expired by now. Returns how many codes were evicted."""
+        now = int(self._clock())
+        expired = set()
+        while self._heap and self._heap[0][0] <= now:
+            _, code = heapq.heappop(self._heap)
+            self._scheduled.discard(code)
+            expired.add(code)
+        try:
+            while True:
+                codes = await self.delete_expired(now, self.batch_size)
+                expired.update(codes)
+                self.removed += len(codes)
+                if len(codes) < self.batch_size:
+                    break
+        finally:
+            # Codes popped from the heap may already have been deleted by another worker;
+            # they are still evicted from the caches here
+            if expired:
+                self.on_expired(list(expired))
+        return len(expired)
+
+    async def _run(self):
+        next_full_sweep = self._clock()
+        while True:
+            deadline = min(next_full_sweep, self._heap[0][0]) if self._heap else next_full_sweep
+            delay = deadline - self._clock()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Expiration sweep failed: {e}")
+            next_full_sweep = self._clock() + self.interval
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
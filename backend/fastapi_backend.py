@@ -1,22 +1,100 @@
+import csv
+import hashlib
+import io
+import json
 import os
+import asyncio
 import sys
-from fastapi import FastAPI, HTTPException, status
+import tempfile
+import time
+from fastapi import FastAPI, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import credentials, auth, firestore_async
 from datetime import datetime, timezone
-import random
-import string
-from starlette.responses import RedirectResponse  # Import needed for the redirect endpoint
+from urllib.parse import urlsplit, urlunsplit
+# RedirectResponse is needed for the redirect endpoint
+from starlette.responses import PlainTextResponse, RedirectResponse, StreamingResponse
+
+from click_buffer import ClickBuffer
+from code_allocator import CodeAllocator, RangeLeaseAllocator
+from expiration import ExpirationSweeper, parse_expiration
+from firestore_storage import FirestoreStorage
+from instrumentation import InstrumentedStorage, StorageTracer
+from invalidation import InvalidationChannel
+from metrics import MetricsMiddleware, registry
+from redirect_cache import RedirectCache, MISS
+from redirect_table import RedirectTable, acquire_builder_lock, build_table
+from sqlite_storage import SqliteStorage
+from storage import PartialWriteError, Storage, decode_cursor, encode_cursor, iter_by_user
 
 # --- 1. CONFIGURATION AND INITIALIZATION ---
 # NOTE: The 'backend' directory is typically the current working directory (CWD)
 SERVICE_ACCOUNT_KEY_PATH = "../serviceAccountKey.json"
 
-# Initialize Firebase Admin SDK
-try:
+# Storage engine for short links: "firestore" (default) or "sqlite" for a single node without the cloud
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore").lower()
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "shortly.db")
+
+# Storage call tracing (also switchable at runtime via /debug/storage-trace) and slow-call log
+STORAGE_TRACING = os.environ.get("STORAGE_TRACING", "false").lower() in ("1", "true", "yes")
+STORAGE_SLOW_MS = float(os.environ.get("STORAGE_SLOW_MS", "100"))
+STORAGE_SLOW_LOG = os.environ.get("STORAGE_SLOW_LOG")  # file path; defaults to stderr
+
+# Redirect cache sizing (entries) and lifetimes (seconds)
+REDIRECT_CACHE_SIZE = int(os.environ.get("REDIRECT_CACHE_SIZE", "100000"))
+REDIRECT_CACHE_TTL = float(os.environ.get("REDIRECT_CACHE_TTL", "300"))
+REDIRECT_CACHE_NEGATIVE_TTL = float(os.environ.get("REDIRECT_CACHE_NEGATIVE_TTL", "30"))
+
+# Workers on this host exchange cache invalidations through Unix sockets in this directory. The
+# default is keyed on the storage they serve, so every process on the same links hears the others
+# however it was launched (uvicorn --workers, this file's launcher, gunicorn), and none else does
+STORAGE_LOCATION = os.path.abspath(SQLITE_PATH if STORAGE_BACKEND == "sqlite" else SERVICE_ACCOUNT_KEY_PATH)
+INVALIDATION_DIR = os.environ.get("INVALIDATION_DIR", os.path.join(
+    tempfile.gettempdir(),
+    "shortly-invalidation-" + hashlib.sha256(f"{STORAGE_BACKEND}:{STORAGE_LOCATION}".encode()).hexdigest()[:12]))
+
+# Optional mmap'ed redirect table shared by all workers on the host. One worker, elected through a
+# lock file, rebuilds it from storage at startup and every REDIRECT_TABLE_REFRESH seconds; every
+# worker re-maps it when the file is replaced
+REDIRECT_TABLE_PATH = os.environ.get("REDIRECT_TABLE_PATH")
+REDIRECT_TABLE_REFRESH = float(os.environ.get("REDIRECT_TABLE_REFRESH", "30"))
+
+# Click counters are buffered in memory and flushed every interval (seconds) or once this many clicks are pending
+CLICK_FLUSH_INTERVAL = float(os.environ.get("CLICK_FLUSH_INTERVAL", "2"))
+CLICK_FLUSH_MAX_PENDING = int(os.environ.get("CLICK_FLUSH_MAX_PENDING", "1000"))
+
+# Expired links are swept from storage at least this often (seconds), this many per storage call
+EXPIRATION_SWEEP_INTERVAL = float(os.environ.get("EXPIRATION_SWEEP_INTERVAL", "60"))
+EXPIRATION_SWEEP_BATCH = int(os.environ.get("EXPIRATION_SWEEP_BATCH", "500"))
+
+# Short codes are allocated from blocks of this many ids leased from the storage counter
+SHORT_CODE_LENGTH = 6
+CODE_BLOCK_SIZE = int(os.environ.get("CODE_BLOCK_SIZE", "1000"))
+MAX_CODE_ATTEMPTS = 10
+
+# Public prefix of shortened links
+SHORT_URL_BASE = "http://127.0.0.1:8000/r/"
+
+# Return the user's existing code when they shorten the same URL again (overridable per request)
+DEDUP_URLS = os.environ.get("DEDUP_URLS", "false").lower() in ("1", "true", "yes")
+
+# Upper bound on URLs per /api/shorten/batch request
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "1000"))
+
+# Page size bounds for /api/urls/{user_id}
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched from storage per chunk of /api/urls/{user_id}/export
+EXPORT_PAGE_SIZE = 500
+EXPORT_FIELDS = ["short_code", "original_url", "clicks", "created_at", "user_id", "expires_at"]
+
+
+def init_firebase():
+    """Initializes the Firebase Admin SDK and returns the app."""
     # Check if the file exists before trying to load it
     if not os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
         # NOTE: If this error occurs, you need to place the JSON key in the
@@ -26,18 +104,40 @@ try:
     cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
     # Check if app is already initialized (important for --reload)
     if not firebase_admin._apps:
-        firebase_app = firebase_admin.initialize_app(cred)
-    else:
-        firebase_app = firebase_admin.get_app()
+        return firebase_admin.initialize_app(cred)
+    return firebase_admin.get_app()
+
+
+def create_storage() -> Storage:
+    """Builds the storage engine selected by STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteStorage(SQLITE_PATH)
+    if STORAGE_BACKEND == "firestore":
+        # Async client so URL handlers can await storage instead of blocking a threadpool worker
+        return FirestoreStorage(firestore_async.client(init_firebase()))
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
 
-    db = firestore.client(firebase_app)
-    print("Firebase Admin SDK successfully initialized.")
+
+storage_tracer = StorageTracer(enabled=STORAGE_TRACING, slow_threshold_ms=STORAGE_SLOW_MS,
+                               slow_log_path=STORAGE_SLOW_LOG)
+
+try:
+    # Every storage call is timed for /metrics and traced while storage_tracer is enabled
+    storage = InstrumentedStorage(create_storage(), storage_tracer)
+    print(f"Storage backend '{STORAGE_BACKEND}' successfully initialized.")
 
 except Exception as e:
-    print(f"❌ FATAL ERROR: Failed to initialize Firebase Admin SDK. Please check path and file name: {e}")
-    # Exit gracefully if Firebase fails to initialize
+    print(f"❌ FATAL ERROR: Failed to initialize the '{STORAGE_BACKEND}' storage backend: {e}")
+    # Exit gracefully if storage fails to initialize
     sys.exit(1)
 
+# The auth endpoints always need Firebase; with SQLite storage they are optional
+if STORAGE_BACKEND != "firestore":
+    try:
+        init_firebase()
+    except Exception as e:
+        print(f"Firebase Admin SDK not initialized, auth endpoints disabled: {e}")
+
 
 # --- 2. Pydantic Models for Data Validation ---
 class AuthRequest(BaseModel):
@@ -49,6 +149,17 @@ class ShortenRequest(BaseModel):
     original_url: str = Field(..., description="The long URL to be shortened.")
     # user_id is required here since you are using it in your query
     user_id: str = Field(..., description="The authenticated user ID.")
+    dedup: Optional[bool] = Field(None, description="Reuse the user's existing code for the same URL. "
+                                                    "Only links that never expire are reused. "
+                                                    "Defaults to the server's DEDUP_URLS setting.")
+    expiration: Optional[str] = Field(None, description='Lifetime such as "7 days" or "30 days". '
+                                                        'Omitted or "Never" keeps the link forever.')
+
+
+class BatchShortenRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="The long URLs to be shortened.")
+    user_id: str = Field(..., description="The authenticated user ID.")
+    expiration: Optional[str] = Field(None, description='Lifetime applied to every URL, e.g. "7 days".')
 
 
 class UrlInfo(BaseModel):
@@ -58,6 +169,8 @@ class UrlInfo(BaseModel):
     created_at: str
     # Add a user_id field to the response model as it's saved in Firestore
     user_id: Optional[str] = None
+    # Unix seconds; None for links that never expire
+    expires_at: Optional[int] = None
 
 
 # --- 3. FastAPI App Initialization ---
@@ -70,18 +183,177 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+# Per-route request counts, status codes and latency histograms, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
+# In-process short_code -> original_url cache in front of Firestore for /r/{short_code}
+redirect_cache = RedirectCache(
+    max_size=REDIRECT_CACHE_SIZE,
+    ttl=REDIRECT_CACHE_TTL,
+    negative_ttl=REDIRECT_CACHE_NEGATIVE_TTL,
+)
+registry.gauge("shortly_redirect_cache_hits", "Redirect cache hits since start.", lambda: redirect_cache.hits)
+registry.gauge("shortly_redirect_cache_misses", "Redirect cache misses since start.", lambda: redirect_cache.misses)
+registry.gauge("shortly_redirect_cache_hit_ratio", "Share of redirect lookups served from the cache.",
+               lambda: redirect_cache.stats()["hit_ratio"])
+registry.gauge("shortly_redirect_cache_entries", "Entries held in the redirect cache.", lambda: len(redirect_cache))
+
+redirect_table = RedirectTable(REDIRECT_TABLE_PATH) if REDIRECT_TABLE_PATH else None
+registry.gauge("shortly_redirect_table_entries", "Entries in the shared redirect table.",
+               lambda: redirect_table.entries if redirect_table else 0)
+
+
+# Codes evicted while this worker rebuilds the redirect table; the rebuilt file may still hold them
+evicted_during_rebuild = None
+
+
+def evict_code(short_code: str):
+    """Removes a short code from this worker's cache and from the shared redirect table."""
+    redirect_cache.invalidate(short_code)
+    if redirect_table is not None:
+        redirect_table.remove(short_code)
+        if evicted_during_rebuild is not None:
+            evicted_during_rebuild.add(short_code)
+
+
+# Keeps the per-worker redirect caches coherent when running with several workers
+invalidation_channel = InvalidationChannel(INVALIDATION_DIR, evict_code)
 
 
 # --- 4. Helper Functions ---
-def generate_short_code(length=6):
-    """Generates a random, unique short code."""
-    characters = string.ascii_letters + string.digits
+# Every uvicorn worker leases its own blocks, so codes never collide across workers
+code_allocator: CodeAllocator = RangeLeaseAllocator(storage.lease_ids, block_size=CODE_BLOCK_SIZE,
+                                                    length=SHORT_CODE_LENGTH)
+
+click_buffer = ClickBuffer(storage.increment_clicks, flush_interval=CLICK_FLUSH_INTERVAL,
+                           max_pending=CLICK_FLUSH_MAX_PENDING)
+registry.gauge("shortly_click_buffer_pending", "Clicks buffered but not yet written to storage.", click_buffer.pending)
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used for dedup: lowercase scheme and host, no default port, '/' for an empty path.
+    URLs that urlsplit cannot parse (bad port, unbalanced IPv6 brackets) are used as given.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username or parts.password:
+        host = f"{parts.netloc.rsplit('@', 1)[0]}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, parts.fragment))
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+
+def is_expired(expires_at: Optional[int]) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+
+def new_url_record(original_url: str, user_id: str, code: str, created_at: str,
+                   expires_at: Optional[int] = None) -> dict:
+    """Builds the stored document for a freshly shortened URL."""
+    return {
+        "original_url": original_url,
+        "user_id": user_id,
+        "clicks": 0,
+        "created_at": created_at,
+        "short_code": code,
+        "url_hash": url_hash(original_url),
+        "expires_at": expires_at
+    }
+
+
+def expires_at_for(expiration: Optional[str], now: datetime) -> Optional[int]:
+    """Absolute expiry in Unix seconds for a requested lifetime. Raises ValueError if it is malformed."""
+    lifetime = parse_expiration(expiration)
+    return int(now.timestamp()) + lifetime if lifetime is not None else None
+
+
+def invalidate_codes(codes):
+    """Evicts short codes from this worker's redirect cache and from every other worker's."""
+    for code in codes:
+        evict_code(code)
+    invalidation_channel.publish(codes)
+
+
+# Deletes expired links in bulk and evicts them from every worker's caches
+expiration_sweeper = ExpirationSweeper(storage.delete_expired, invalidate_codes, interval=EXPIRATION_SWEEP_INTERVAL,
+                                       batch_size=EXPIRATION_SWEEP_BATCH)
+registry.gauge("shortly_expired_links_removed", "Expired links deleted by this worker's sweeper.",
+               lambda: expiration_sweeper.removed)
+
+
+async def rebuild_redirect_table(page_size=5000):
+    """Writes a fresh redirect table at REDIRECT_TABLE_PATH from every link in storage."""
+    global evicted_during_rebuild
+    evicted_during_rebuild = set()
+    try:
+        links = []
+        after = None
+        while True:
+            rows = await storage.list_all(page_size, after)
+            links.extend((row["short_code"], row["original_url"], row.get("expires_at")) for row in rows)
+            if len(rows) < page_size:
+                break
+            after = rows[-1]["short_code"]
+        count = await asyncio.to_thread(build_table, REDIRECT_TABLE_PATH, links)
+        redirect_table.refresh()
+        # Links deleted after they were read would otherwise resolve again from the new file
+        for code in evicted_during_rebuild:
+            redirect_table.remove(code)
+        return count
+    finally:
+        evicted_during_rebuild = None
+
+
+async def refresh_redirect_table():
+    builder_lock = None
     while True:
-        code = ''.join(random.choice(characters) for i in range(length))
-        # Check if code already exists in Firestore (simple check)
-        if db.collection("short_urls").document(code).get().exists is False:
-            return code
+        try:
+            if builder_lock is None:
+                builder_lock = acquire_builder_lock(REDIRECT_TABLE_PATH)
+            if builder_lock is not None:
+                await rebuild_redirect_table()
+            else:
+                redirect_table.refresh()
+        except Exception as e:
+            print(f"Failed to rebuild or reload redirect table: {e}")
+        await asyncio.sleep(REDIRECT_TABLE_REFRESH)
+
+
+background_tasks = []
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    click_buffer.start()
+    invalidation_channel.start()
+    expiration_sweeper.start()
+    if redirect_table is not None:
+        background_tasks.append(asyncio.create_task(refresh_redirect_table()))
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    invalidation_channel.stop()
+    await expiration_sweeper.stop()
+    await click_buffer.stop()
+    await storage.close()
 
 
 # --- 5. AUTHENTICATION ENDPOINTS (Used by PyQt5 AuthApp) ---
@@ -145,45 +417,144 @@ def login_user(request: AuthRequest):
 # --- 6. URL SHORTENER ENDPOINTS (Used by PyQt5 HomeWindow) ---
 
 @app.post("/api/shorten")
-def create_short_url(request: ShortenRequest):
-    """Shortens a URL and saves it to Firestore."""
+async def create_short_url(request: ShortenRequest):
+    """Shortens a URL and saves it to storage."""
     if not request.original_url.startswith('http'):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="URL must start with http:// or https://")
 
+    now = datetime.now(timezone.utc)
     try:
-        code = generate_short_code()
-
-        url_data = {
-            "original_url": request.original_url,
-            "user_id": request.user_id,
-            "clicks": 0,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "short_code": code
-        }
+        expires_at = expires_at_for(request.expiration, now)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        # Save to Firestore
-        db.collection("short_urls").document(code).set(url_data)
-
-        return {"short_code": code, "full_short_url": f"http://127.0.0.1:8000/r/{code}"}
+    try:
+        dedup = DEDUP_URLS if request.dedup is None else request.dedup
+        # A link with a lifetime always gets its own code: no existing code expires when this one should
+        if dedup and expires_at is None:
+            # One indexed lookup on (user_id, url_hash) instead of minting another code
+            existing = await storage.find_by_url_hash(request.user_id, url_hash(request.original_url))
+            if existing and existing.get("expires_at") is None:
+                code = existing["short_code"]
+                return {"short_code": code, "full_short_url": f"{SHORT_URL_BASE}{code}", "existing": True}
+
+        created_at = now.isoformat()
+
+        # One write per code: create() fails instead of overwriting, which only happens
+        # when a code minted by the old random generator is already taken
+        for _ in range(MAX_CODE_ATTEMPTS):
+            code = await code_allocator.next_code()
+            if await storage.create(new_url_record(request.original_url, request.user_id, code, created_at,
+                                                   expires_at)):
+                break
+        else:
+            raise RuntimeError("Could not allocate a free short code.")
+        if expires_at is not None:
+            expiration_sweeper.schedule(code, expires_at)
+
+        # Drop any cached 404 for a code that now exists
+        invalidate_codes([code])
+
+        return {"short_code": code, "full_short_url": f"{SHORT_URL_BASE}{code}"}
 
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to shorten URL: {e}")
 
 
+@app.post("/api/shorten/batch")
+async def create_short_urls_batch(request: BatchShortenRequest):
+    """
+    Shortens many URLs in one request.
+    Codes are allocated in bulk and written with batched writes; every item reports its own result.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        expires_at = expires_at_for(request.expiration, now)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    results = [None] * len(request.urls)
+    pending = []
+    for index, original_url in enumerate(request.urls):
+        if original_url.startswith('http'):
+            pending.append(index)
+        else:
+            results[index] = {"index": index, "original_url": original_url,
+                              "error": "URL must start with http:// or https://"}
+
+    created_at = now.isoformat()
+    created_codes = []
+    failure = "Could not allocate a free short code."
+    try:
+        # Items whose code turned out to be taken get a fresh code in the next round
+        for _ in range(MAX_CODE_ATTEMPTS):
+            if not pending:
+                break
+            codes = await code_allocator.next_codes(len(pending))
+            records = [new_url_record(request.urls[index], request.user_id, code, created_at, expires_at)
+                       for index, code in zip(pending, codes)]
+            try:
+                created = await storage.create_many(records)
+                error = None
+            except PartialWriteError as e:
+                created, error = e.created, e
+
+            retry = []
+            for index, record, ok in zip(pending, records, created):
+                if not ok:
+                    retry.append(index)
+                    continue
+                code = record["short_code"]
+                created_codes.append(code)
+                if expires_at is not None:
+                    expiration_sweeper.schedule(code, expires_at)
+                results[index] = {"index": index, "original_url": record["original_url"],
+                                  "short_code": code, "full_short_url": f"{SHORT_URL_BASE}{code}"}
+            if error is not None:
+                # Only the items after the committed part failed
+                pending = retry + pending[len(created):]
+                failure = f"Failed to shorten URL: {error}"
+                break
+            pending = retry
+
+    except Exception as e:
+        failure = f"Failed to shorten URL: {e}"
+
+    for index in pending:
+        results[index] = {"index": index, "original_url": request.urls[index], "error": failure}
+
+    # Drop any cached 404s for codes that now exist
+    invalidate_codes(created_codes)
+
+    failed = sum(1 for result in results if "error" in result)
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
 @app.get("/api/urls/{user_id}", response_model=List[UrlInfo])
-def get_user_urls(user_id: str):
-    """Fetches all shortened URLs belonging to a specific user from Firestore."""
+async def get_user_urls(
+        user_id: str,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header."),
+):
+    """
+    Fetches one page of a user's shortened URLs, newest first.
+    When more remain, the X-Next-Cursor response header holds the cursor for the next page.
+    """
     try:
-        # Query Firestore for documents where user_id matches
-        urls_ref = db.collection("short_urls").where("user_id", "==", user_id).stream()
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        urls_list = []
-        for doc in urls_ref:
-            data = doc.to_dict()
-            # Ensure the data conforms to the Pydantic model
-            urls_list.append(UrlInfo(**data))
+    try:
+        # Ask for one extra row to learn whether another page exists
+        rows = await storage.list_by_user(user_id, limit + 1, after)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
 
-        return urls_list
+        # Ensure the data conforms to the Pydantic model
+        return [UrlInfo(**data) for data in rows]
 
     except Exception as e:
         print(f"Error fetching URLs for user {user_id}: {e}")
@@ -191,34 +562,132 @@ def get_user_urls(user_id: str):
         return []
 
 
+async def export_rows(user_id: str, export_format: str):
+    """Encodes the user's links as NDJSON or CSV, one storage page per chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    if export_format == "csv":
+        writer.writeheader()
+        yield buffer.getvalue()
+
+    try:
+        async for rows in iter_by_user(storage, user_id, EXPORT_PAGE_SIZE):
+            if export_format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps({field: row.get(field) for field in EXPORT_FIELDS}) + "\n" for row in rows)
+    except Exception as e:
+        # Headers are already sent, so the truncated body is the only signal left
+        print(f"Error exporting URLs for user {user_id}: {e}")
+
+
+@app.get("/api/urls/{user_id}/export")
+async def export_user_urls(user_id: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Streams every URL belonging to a user as NDJSON (default) or CSV."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(user_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{user_id}-urls.{format}"'},
+    )
+
+
+@app.delete("/api/urls/{user_id}/{short_code}")
+async def delete_user_url(user_id: str, short_code: str):
+    """Deletes one of the user's shortened URLs and evicts it from the redirect cache."""
+    try:
+        data = await storage.get(short_code)
+
+        if data is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found.")
+        if data.get("user_id") != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Short URL belongs to another user.")
+
+        await storage.delete(short_code)
+        invalidate_codes([short_code])
+
+        return {"message": "Short URL deleted.", "short_code": short_code}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to delete URL: {e}")
+
+
 # --- 7. REDIRECT ENDPOINT ---
 
 @app.get("/r/{short_code}")
-def redirect_to_long_url(short_code: str):
+async def redirect_to_long_url(short_code: str):
     """Endpoint to redirect the short code to the original URL."""
     try:
-        doc_ref = db.collection("short_urls").document(short_code)
-        doc = doc_ref.get()
-
-        if not doc.exists:
+        # The shared table answers without touching this worker's own memory; links created
+        # since it was built fall through to the LRU cache and storage
+        original_url = redirect_table.get(short_code) if redirect_table is not None else None
+
+        if original_url is None:
+            original_url = redirect_cache.get(short_code)
+
+        if original_url is MISS:
+            data = await storage.get(short_code)
+            original_url, expires_in = None, None
+            # expires_at is stored as Unix seconds, so the expiry check is one integer comparison
+            if data and not is_expired(data.get("expires_at")):
+                original_url = data.get("original_url")
+                if data.get("expires_at") is not None:
+                    expires_in = data["expires_at"] - time.time()
+                    expiration_sweeper.schedule(short_code, data["expires_at"])
+            # The cache entry is capped at the link's remaining lifetime
+            redirect_cache.put(short_code, original_url, expires_in)
+
+        if original_url is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found.")
 
-        data = doc.to_dict()
-        original_url = data.get("original_url")
-        clicks = data.get("clicks", 0) + 1
-
-        # Increment click count in Firestore
-        doc_ref.update({"clicks": clicks})
+        # Count the click in memory; it is written to storage in the background
+        click_buffer.add(short_code)
 
         # Perform the redirect
         return RedirectResponse(url=original_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Redirect failed: {e}")
 
 
+# --- 8. METRICS AND DIAGNOSTICS ENDPOINTS ---
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics for this worker."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/storage-trace")
+async def get_storage_trace():
+    """Returns the tracing settings and the most recent storage spans of this worker."""
+    return storage_tracer.status()
+
+
+@app.put("/debug/storage-trace")
+async def configure_storage_trace(enabled: Optional[bool] = None, slow_ms: Optional[float] = Query(None, ge=0)):
+    """Turns storage tracing on or off and adjusts the slow-call threshold at runtime."""
+    storage_tracer.configure(enabled=enabled, slow_threshold_ms=slow_ms)
+    return {"enabled": storage_tracer.enabled, "slow_threshold_ms": storage_tracer.slow_threshold_ms}
+
+
 if __name__ == "__main__":
     # If you run the file directly, it will start uvicorn
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # WEB_CONCURRENCY=N serves with N worker processes (0 = one per CPU core); caches stay
+    # coherent across them through the invalidation channel
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1")) or os.cpu_count()
+    port = int(os.environ.get("PORT", "8000"))
+
+    if workers == 1:
+        uvicorn.run(app, host="0.0.0.0", port=port)
+    else:
+        uvicorn.run("fastapi_backend:app", host="0.0.0.0", port=port, workers=workers)
\ No newline at end of file
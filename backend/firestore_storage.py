@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional
+
+from google.api_core.exceptions import Conflict, NotFound
+from firebase_admin import firestore_async
+
+from storage import PageKey, PartialWriteError
+
+FIRESTORE_BATCH_LIMIT = 500
+
+
+class FirestoreStorage:
+    """Storage implementation backed by a Cloud Firestore AsyncClient."""
+
+    def __init__(self, client, collection: str = "short_urls"):
+        self.client = client
+        self.links = client.collection(collection)
+        self.counter_ref = client.collection("counters").document("short_codes")
+
+    async def create(self, record: dict) -> bool:
+        """Writes a new link. Returns False if the short code is already taken."""
+        try:
+            await self.links.document(record["short_code"]).create(record)
+            return True
+        except Conflict:
+            return False
+
+    async def create_many(self, records: List[dict]) -> List[bool]:
+        created = []
+        for start in range(0, len(records), FIRESTORE_BATCH_LIMIT):
+            chunk = records[start:start + FIRESTORE_BATCH_LIMIT]
+            batch = self.client.batch()
+            for record in chunk:
+                batch.create(self.links.document(record["short_code"]), record)
+            try:
+                try:
+                    await batch.commit()
+                    created.extend([True] * len(chunk))
+                except Conflict:
+                    # Batches are atomic, so one taken code rejects the chunk; write it one by one instead
+                    for record in chunk:
+                        created.append(await self.create(record))
+            except Exception as e:
+                # Earlier chunks are already committed, so report them instead of failing the whole batch
+                if not created:
+                    raise
+                raise PartialWriteError(created, e) from e
+        return created
+
+    async def get(self, short_code: str) -> Optional[dict]:
+        doc = await self.links.document(short_code).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def list_by_user(self, user_id: str, limit: int, after: Optional[PageKey] = None) -> List[dict]:
+        # Served by the (user_id, created_at desc, short_code desc) composite index in firestore.indexes.json
+        query = (self.links.where("user_id", "==", user_id)
+                 .order_by("created_at", direction=firestore_async.Query.DESCENDING)
+                 .order_by("short_code", direction=firestore_async.Query.DESCENDING))
+        if after is not None:
+            query = query.start_after({"created_at": after[0], "short_code": after[1]})
+        return [doc.to_dict() async for doc in query.limit(limit).stream()]
+
+    async def list_all(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        query = self.links.order_by("short_code")
+        if after is not None:
+            query = query.start_after({"short_code": after})
+        return [doc.to_dict() async for doc in query.limit(limit).stream()]
+
+    async def find_by_url_hash(self, user_id: str, url_hash: str) -> Optional[dict]:
+        # Equality-only query, served by Firestore's automatic single-field indexes
+        query = self.links.where("user_id", "==", user_id).where("url_hash", "==", url_hash).limit(1)
+        async for doc in query.stream():
+            return doc.to_dict()
+        return None
+
+    async def increment_clicks(self, counts: Dict[str, int]):
+        """Applies click deltas as atomic increments, popping each code once written."""
+        codes = list(counts)
+        for start in range(0, len(codes), FIRESTORE_BATCH_LIMIT):
+            chunk = codes[start:start + FIRESTORE_BATCH_LIMIT]
+            batch = self.client.batch()
+            for code in chunk:
+                batch.update(self.links.document(code), {"clicks": firestore_async.Increment(counts[code])})
+            try:
+                await batch.commit()
+            except NotFound:
+                # A link was deleted while its clicks were buffered; apply the rest one by one
+                for code in chunk:
+                    try:
+                        await self.links.document(code).update({"clicks": firestore_async.Increment(counts[code])})
+                    except NotFound:
+                        pass
+                    del counts[code]
+                continue
+            for code in chunk:
+                del counts[code]
+
+    async def delete(self, short_code: str):
+        await self.links.document(short_code).delete()
+
+    async def delete_expired(self, now: int, limit: int) -> List[str]:
+        # Range query on the automatic single-field index; links without expires_at never match
+        query = self.links.where("expires_at", "<=", now).order_by("expires_at").limit(limit)
+        refs = [doc.reference async for doc in query.stream()]
+        for start in range(0, len(refs), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for ref in refs[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.delete(ref)
+            await batch.commit()
+        return [ref.id for ref in refs]
+
+    async def lease_ids(self, count: int) -> int:
+        """Atomically reserves `count` ids from the shared counter and returns the first one."""
+        counter_ref = self.counter_ref
+
+        @firestore_async.async_transactional
+        async def _lease(transaction):
+            snapshot = await counter_ref.get(transaction=transaction)
+            start = snapshot.get("next") if snapshot.exists else 0
+            transaction.set(counter_ref, {"next": start + count})
+            return start
+
+        return await _lease(self.client.transaction())
+
+    async def close(self):
+        # The AsyncClient's channels are owned by the firebase_admin app
+        pass
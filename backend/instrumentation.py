@@ -0,0 +1,120 @@
+import functools
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from metrics import observe_storage_call
+
+# Storage methods that are instrumented; close() is deliberately left out
+STORAGE_OPERATIONS = ("create", "create_many", "get", "list_by_user", "list_all", "find_by_url_hash",
+                      "increment_clicks", "delete", "delete_expired", "lease_ids")
+
+# Operations whose document count is the size of their first argument (it may be consumed by the call)
+BULK_WRITE_OPERATIONS = ("create_many", "increment_clicks")
+
+slow_log = logging.getLogger("shortly.storage.slow")
+
+
+def _document_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+class StorageTracer:
+    """
+    Runtime-switchable tracing of storage calls.
+
+    While enabled, every call produces a span (operation, document count, duration)
+    kept in a bounded ring buffer. Calls slower than `slow_threshold_ms` are written
+    to the "shortly.storage.slow" log whether or not tracing is enabled.
+    """
+
+    def __init__(self, enabled: bool = False, slow_threshold_ms: float = 100.0, max_spans: int = 1000,
+                 slow_log_path: Optional[str] = None):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.spans = deque(maxlen=max_spans)
+        if slow_log_path:
+            handler = logging.FileHandler(slow_log_path)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            slow_log.addHandler(handler)
+            slow_log.setLevel(logging.WARNING)
+
+    def configure(self, enabled: Optional[bool] = None, slow_threshold_ms: Optional[float] = None):
+        if enabled is not None:
+            self.enabled = enabled
+            if not enabled:
+                self.spans.clear()
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+
+    def wants(self, duration: float) -> bool:
+        """Whether a call that took `duration` seconds should be passed to record()."""
+        return self.enabled or duration * 1000 >= self.slow_threshold_ms
+
+    def record(self, operation: str, documents: int, duration: float, error: Optional[str] = None):
+        duration_ms = duration * 1000
+        if self.enabled:
+            span = {
+                "operation": operation,
+                "documents": documents,
+                "duration_ms": round(duration_ms, 3),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }
+            if error:
+                span["error"] = error
+            self.spans.append(span)
+        if duration_ms >= self.slow_threshold_ms:
+            slow_log.warning("slow storage call: %s documents=%d duration_ms=%.1f%s", operation, documents,
+                             duration_ms, f" error={error}" if error else "")
+
+    def status(self) -> dict:
+        return {"enabled": self.enabled, "slow_threshold_ms": self.slow_threshold_ms, "spans": list(self.spans)}
+
+
+class InstrumentedStorage:
+    """
+    Storage wrapper that times every call into the storage latency histogram and
+    hands it to the tracer when tracing is enabled or the call was slow.
+
+    Wrappers are built once at construction, so a call costs one extra coroutine
+    frame and two perf_counter() reads on top of the wrapped storage.
+    """
+
+    def __init__(self, storage, tracer: Optional[StorageTracer] = None):
+        self.storage = storage
+        self.tracer = tracer or StorageTracer()
+        for operation in STORAGE_OPERATIONS:
+            setattr(self, operation, self._wrap(operation, getattr(storage, operation)))
+
+    def _wrap(self, operation, method):
+        tracer = self.tracer
+        bulk_write = operation in BULK_WRITE_OPERATIONS
+
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            documents = len(args[0]) if bulk_write and args else None
+            started = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                observe_storage_call(operation, elapsed, failed=True)
+                if tracer.wants(elapsed):
+                    tracer.record(operation, documents or 0, elapsed, error=repr(e))
+                raise
+            elapsed = time.perf_counter() - started
+            observe_storage_call(operation, elapsed)
+            if tracer.wants(elapsed):
+                tracer.record(operation, _document_count(result) if documents is None else documents, elapsed)
+            return result
+
+        return timed
+
+    async def close(self):
+        await self.storage.close()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import socket
+from typing import Callable, Iterable, Optional
+
+# Codes are joined with newlines and sent in datagrams of at most this many bytes
+MAX_DATAGRAM = 8192
+
+
+class InvalidationChannel:
+    """
+    Local pub/sub of redirect cache invalidations between worker processes.
+
+    Every worker binds a Unix datagram socket named after its pid inside a shared
+    directory. `publish()` sends the changed short codes to every other socket in
+    that directory, and each receiver evicts them from its own cache on the event
+    loop, typically well under a millisecond later. Sockets left behind by dead
+    workers are removed the first time a send to them is refused.
+
+    On platforms without Unix datagram sockets the channel stays disabled and
+    caches fall back to their TTL.
+    """
+
+    def __init__(self, directory: str, on_invalidate: Callable[[str], None]):
+        self.directory = directory
+        self.on_invalidate = on_invalidate
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self.sock: Optional[socket.socket] = None
+        self._loop = None
+
+    def start(self):
+        """Binds this worker's socket and starts receiving on the running event loop."""
+        if self.sock is not None:
+            return
+        if not hasattr(socket, "AF_UNIX"):
+            print("Cache invalidation channel disabled: Unix sockets are not available on this platform.")
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self.path)
+            sock.setblocking(False)
+        except OSError as e:
+            print(f"Cache invalidation channel disabled: {e}")
+            return
+        self.sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._receive)
+
+    def stop(self):
+        if self.sock is None:
+            return
+        self._loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+        self.sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def publish(self, codes: Iterable[str]):
+        """Tells every other worker to drop `codes` from its cache."""
+        if self.sock is None:
+            return
+        for datagram in self._pack(codes):
+            for peer in self._peers():
+                try:
+                    self.sock.sendto(datagram, peer)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker that owned this socket is gone
+                    try:
+                        os.unlink(peer)
+                    except OSError:
+                        pass
+                except BlockingIOError:
+                    print(f"Cache invalidation dropped for {peer}: receiver is not keeping up.")
+
+    def _peers(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names
+                if name.endswith(".sock") and os.path.join(self.directory, name) != self.path]
+
+    @staticmethod
+    def _pack(codes: Iterable[str]):
+        datagram = b""
+        for code in codes:
+            encoded = code.encode()
+            if datagram and len(datagram) + len(encoded) + 1 > MAX_DATAGRAM:
+                yield datagram
+                datagram = b""
+            datagram = datagram + b"\n" + encoded if datagram else encoded
+        if datagram:
+            yield datagram
+
+    def _receive(self):
+        while True:
+            try:
+                datagram = self.sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            for code in datagram.decode().split("\n"):
+                if code:
+                    self.on_invalidate(code)
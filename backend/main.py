@@ -1,13 +1,16 @@
 import sys
 import requests
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QFrame, QTableWidget, \
-    QTableWidgetItem, QHeaderView, QApplication  # Added QApplication for execution
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QFrame, QTableView, \
+    QHeaderView, QApplication  # Added QApplication for execution
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QColor
 
 # API URL must match the server
 API_URL = "http://127.0.0.1:8000/api"
 
+# Rows requested per page; the table asks for the next page when it is scrolled near the end
+FETCH_PAGE_SIZE = 200
+
 STYLESHEET = """
 QMainWindow {
     background-color: #F8F8F8; 
@@ -35,7 +38,7 @@ QLabel {
     font-weight: 600;
     color: #374151;
 }
-QTableWidget {
+QTableView {
     border: 1px solid #D9D9D9;
     border-radius: 10px;
     gridline-color: #E5E7EB;
@@ -53,6 +56,184 @@ QHeaderView::section {
 """
 
 
+class FetchPageWorker(QThread):
+    """
+    Worker thread that fetches one page of the user's URLs with the limit/cursor
+    API. Call cancel() to drop the page once the request in flight returns.
+    """
+    # rows, cursor of the next page ("" on the last page)
+    page_loaded = pyqtSignal(list, str)
+    error = pyqtSignal(str)
+
+    def __init__(self, user_id, cursor=None, page_size=FETCH_PAGE_SIZE):
+        super().__init__()
+        self.user_id = user_id
+        self.cursor = cursor
+        self.page_size = page_size
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        url = f"{API_URL}/urls/{self.user_id}"
+        params = {"limit": self.page_size}
+        if self.cursor:
+            params["cursor"] = self.cursor
+        try:
+            response = requests.get(url, params=params, timeout=5)
+            if self.isInterruptionRequested():
+                return
+            if response.status_code != 200:
+                try:
+                    error_detail = response.json().get("detail", f"Failed with status {response.status_code}")
+                except requests.exceptions.JSONDecodeError:
+                    error_detail = response.text or f"Failed with status {response.status_code}"
+                self.error.emit(f"API Error fetching URLs: {error_detail}")
+                return
+            self.page_loaded.emit(response.json(), response.headers.get("X-Next-Cursor", ""))
+
+        except requests.exceptions.ConnectionError:
+            self.error.emit("Connection error: Cannot reach the FastAPI server. Is the backend running?")
+        except Exception as e:
+            self.error.emit(f"An unexpected error occurred: {e}")
+
+
+class UrlTableModel(QAbstractTableModel):
+    """
+    Table model over the user's URLs, fetched lazily from the paginated API.
+
+    The view asks for the next page through canFetchMore()/fetchMore() when it
+    scrolls near the end, and only paints the visible rows; rows are kept as the
+    plain dicts the API returns. Sorting reorders the loaded rows in place.
+    """
+    COLUMNS = [("Short Code", "short_code"), ("Original URL", "original_url"), ("Clicks", "clicks"),
+               ("Created At", "created_at")]
+    CLICKS_COLUMN = 2
+
+    loading_changed = pyqtSignal(bool)
+    error = pyqtSignal(str)
+
+    def __init__(self, user_id, parent=None):
+        super().__init__(parent)
+        self.user_id = user_id
+        self.rows = []
+        self.next_cursor = None
+        # Nothing is fetched until reload() starts the first page
+        self.has_more = False
+        self.failed = False
+        self.worker = None
+        # Every started worker stays referenced here until its thread has finished
+        self.live_workers = []
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+
+    # ---- Qt model interface ----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        url_info = self.rows[index.row()]
+        field = self.COLUMNS[index.column()][1]
+        if role == Qt.DisplayRole:
+            if field == "clicks":
+                return str(url_info.get("clicks", 0))
+            if field == "created_at":
+                # Format date for display
+                created_at_str = url_info.get("created_at", "")
+                return created_at_str.split("T")[0] if created_at_str else "N/A"
+            return url_info.get(field, "N/A")
+        if role == Qt.ToolTipRole and field == "original_url":
+            return url_info.get("original_url", "N/A")
+        if role == Qt.TextAlignmentRole and field == "clicks":
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self.failed and self.worker is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        worker = self.worker = FetchPageWorker(self.user_id, self.next_cursor)
+        worker.page_loaded.connect(self._on_page_loaded)
+        worker.error.connect(self._on_error)
+        # Its signals can be handled before run() returns, so self.worker is not what keeps it alive
+        self.live_workers.append(worker)
+        worker.finished.connect(lambda: self.live_workers.remove(worker))
+        worker.start()
+        self.loading_changed.emit(True)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column, self.sort_order = column, order
+        self.layoutAboutToBeChanged.emit()
+        self._sort_rows()
+        self.layoutChanged.emit()
+
+    # ---- Loading ----
+    def _sort_rows(self):
+        if self.sort_column is None:
+            return
+        field = self.COLUMNS[self.sort_column][1]
+        if field == "clicks":
+            key = lambda row: row.get("clicks", 0)
+        else:
+            key = lambda row: row.get(field) or ""
+        self.rows.sort(key=key, reverse=self.sort_order == Qt.DescendingOrder)
+
+    def _on_page_loaded(self, rows, next_cursor):
+        self.worker = None
+        self.next_cursor = next_cursor or None
+        self.has_more = bool(next_cursor)
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+            if self.sort_column is not None:
+                self.sort(self.sort_column, self.sort_order)
+        self.loading_changed.emit(False)
+
+    def _on_error(self, message):
+        self.worker = None
+        self.failed = True
+        self.loading_changed.emit(False)
+        self.error.emit(message)
+
+    def cancel(self):
+        """Stops the page request in flight, if any; its rows are discarded."""
+        worker, self.worker = self.worker, None
+        if worker is None:
+            return
+        worker.page_loaded.disconnect()
+        worker.error.disconnect()
+        # The thread ends after its request in flight (at most the 5 s timeout); live_workers keeps it until then
+        worker.cancel()
+
+    def reload(self):
+        """Drops every loaded row and starts again from the first page."""
+        self.cancel()
+        self.beginResetModel()
+        self.rows = []
+        self.next_cursor = None
+        self.has_more = True
+        self.failed = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def wait(self):
+        for worker in list(self.live_workers):
+            worker.wait()
+
+
 class HomeWindow(QMainWindow):
     """
     Main application window displayed after successful authentication.
@@ -104,6 +285,9 @@ class HomeWindow(QMainWindow):
         main_layout.addWidget(dashboard_title)
 
         # 5. URLs Table Area
+        self.url_model = UrlTableModel(self.user_id, self)
+        self.url_model.loading_changed.connect(self._on_loading_changed)
+        self.url_model.error.connect(self._on_fetch_error)
         self.url_table = self._create_url_table()
         main_layout.addWidget(self.url_table)
 
@@ -118,69 +302,48 @@ class HomeWindow(QMainWindow):
         QTimer.singleShot(100, self.fetch_user_urls)
 
     def _create_url_table(self):
-        table = QTableWidget(0, 4)
-        table.setHorizontalHeaderLabels(["Short Code", "Original URL", "Clicks", "Created At"])
+        table = QTableView()
+        table.setModel(self.url_model)
         table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
         table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.setEditTriggers(QTableView.NoEditTriggers)
         table.setAlternatingRowColors(True)
         table.setMinimumHeight(300)
+        # Newest first, matching the order the API returns pages in
+        table.horizontalHeader().setSortIndicator(3, Qt.DescendingOrder)
+        table.setSortingEnabled(True)
         return table
 
+    def _set_status(self, text, color):
+        self.data_status_label.setText(text)
+        self.data_status_label.setStyleSheet(f"color: {color}; font-weight: 600;")
+
     def fetch_user_urls(self):
-        """Calls the FastAPI server to get the user's URLs."""
+        """Starts loading the user's URLs from the FastAPI server; more pages follow as the table scrolls."""
         if not self.user_id:
-            self.data_status_label.setText("Error: No authenticated user ID.")
-            self.data_status_label.setStyleSheet("color: #EF4444; font-weight: 600;")
+            self._set_status("Error: No authenticated user ID.", "#EF4444")
             return
+        self._set_status("Fetching data...", "#F59E0B")
+        self.url_model.reload()
 
-        # Uses the user_id passed from the AuthApp after successful login
-        url = f"{API_URL}/urls/{self.user_id}"
-
-        try:
-            # Synchronous GET request
-            response = requests.get(url, timeout=5)
-
-            if response.status_code == 200:
-                urls_data = response.json()
-                self._populate_url_table(urls_data)
-                self.data_status_label.setText(f"Successfully loaded {len(urls_data)} URL(s) from Firebase.")
-                self.data_status_label.setStyleSheet("color: #10B981; font-weight: 600;")
-            else:
-                try:
-                    error_detail = response.json().get("detail", f"Failed with status {response.status_code}")
-                except requests.exceptions.JSONDecodeError:
-                    error_detail = response.text or f"Failed with status {response.status_code}"
-
-                self.data_status_label.setText(f"API Error fetching URLs: {error_detail}")
-                self.data_status_label.setStyleSheet("color: #EF4444; font-weight: 600;")
-
-        except requests.exceptions.ConnectionError:
-            self.data_status_label.setText("Connection error: Cannot reach the FastAPI server. Is the backend running?")
-            self.data_status_label.setStyleSheet("color: #EF4444; font-weight: 600;")
-        except Exception as e:
-            self.data_status_label.setText(f"An unexpected error occurred: {e}")
-            self.data_status_label.setStyleSheet("color: #EF4444; font-weight: 600;")
-
-    def _populate_url_table(self, urls_data):
-        self.url_table.setRowCount(len(urls_data))
-        for row, url_info in enumerate(urls_data):
-            self.url_table.setItem(row, 0, QTableWidgetItem(url_info.get('short_code', 'N/A')))
-
-            # Original URL with wrapping
-            original_url_item = QTableWidgetItem(url_info.get('original_url', 'N/A'))
-            original_url_item.setToolTip(url_info.get('original_url', 'N/A'))
-            self.url_table.setItem(row, 1, original_url_item)
-
-            self.url_table.setItem(row, 2, QTableWidgetItem(str(url_info.get('clicks', 0))))
+    def _on_loading_changed(self, loading):
+        count = self.url_model.rowCount()
+        if loading:
+            self._set_status(f"Loading... {count} URL(s) so far.", "#F59E0B")
+        elif not self.url_model.failed:
+            more = " Scroll down to load more." if self.url_model.has_more else ""
+            self._set_status(f"Successfully loaded {count} URL(s) from Firebase.{more}", "#10B981")
 
-            # Format date for display
-            created_at_str = url_info.get('created_at', '')
-            display_date = created_at_str.split('T')[0] if created_at_str else 'N/A'
-            self.url_table.setItem(row, 3, QTableWidgetItem(display_date))
+    def _on_fetch_error(self, message):
+        self._set_status(message, "#EF4444")
 
+    def closeEvent(self, event):
+        self.url_model.cancel()
+        self.url_model.wait()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     # Example execution: Replace 'TEST_USER_ID' with a real UID after login
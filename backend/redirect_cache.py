@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Sentinel returned by RedirectCache.get() when the code is not cached at all.
+# A cached 404 is returned as None so callers can tell the two apart.
+MISS = object()
+
+
+class RedirectCache:
+    """
+    Bounded in-process LRU cache of short_code -> original_url.
+
+    Entries expire after `ttl` seconds; codes that were not found in storage
+    are cached as negative entries for the (usually shorter) `negative_ttl`.
+    All operations are O(1). The async endpoints of one worker use it from the
+    event loop; a single lock guards it so calls from other threads stay safe.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl: float = 300.0, negative_ttl: float = 30.0,
+                 clock=time.monotonic):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        # short_code -> (original_url or None, expires_at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, short_code: str):
+        """Returns the cached URL, None for a cached 404, or MISS."""
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            if entry[1] <= self._clock():
+                del self._entries[short_code]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(short_code)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, short_code: str, original_url: Optional[str], expires_in: Optional[float] = None):
+        """
+        Caches a URL, or a negative entry when original_url is None. `expires_in` is the
+        time left before the link itself expires; the entry never outlives it.
+        """
+        ttl = self.ttl if original_url is not None else self.negative_ttl
+        if expires_in is not None:
+            ttl = min(ttl, expires_in)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[short_code] = (original_url, self._clock() + ttl)
+            self._entries.move_to_end(short_code)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, short_code: str):
+        """Drops short_code after it was deleted, changed or (re)created."""
+        with self._lock:
+            self._entries.pop(short_code, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,197 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MAGIC = b"SHRTTBL1"
+VERSION = 2
+
+# magic, version, slot_count, entry_count, slots_offset, data_offset
+HEADER = struct.Struct("<8sIQQQQ")
+ENTRY_COUNT = struct.Struct("<Q")
+ENTRY_COUNT_OFFSET = 20
+HEADER_SIZE = 64
+# key hash, record offset into the file
+SLOT = struct.Struct("<QQ")
+# code length, URL length, expires_at (Unix seconds, 0 for never); followed by the code and URL bytes
+RECORD = struct.Struct("<BIQ")
+
+EMPTY = 0
+TOMBSTONE = 1
+
+
+def code_hash(code: bytes) -> int:
+    """Process-independent 64-bit hash; 0 and 1 are reserved for empty and deleted slots."""
+    value = int.from_bytes(hashlib.blake2b(code, digest_size=8).digest(), "little")
+    return value if value > TOMBSTONE else value + 2
+
+
+def build_table(path: str, links: Iterable[Tuple[str, str, Optional[int]]], load_factor: float = 0.5) -> int:
+    """
+    Writes a redirect table for (short_code, original_url, expires_at) triples and
+    atomically replaces `path` with it. Returns the number of entries written.
+    """
+    records = []
+    for code, url, expires_at in links:
+        encoded_code, encoded_url = code.encode(), url.encode()
+        if len(encoded_code) > 255:
+            continue
+        records.append((encoded_code, encoded_url, expires_at or 0))
+
+    slot_count = 1
+    while slot_count * load_factor < max(len(records), 1):
+        slot_count *= 2
+    mask = slot_count - 1
+    slots_offset = HEADER_SIZE
+    data_offset = slots_offset + slot_count * SLOT.size
+
+    slots = bytearray(slot_count * SLOT.size)
+    data = bytearray()
+    for encoded_code, encoded_url, expires_at in records:
+        key = code_hash(encoded_code)
+        index = key & mask
+        while SLOT.unpack_from(slots, index * SLOT.size)[0] != EMPTY:
+            index = (index + 1) & mask
+        SLOT.pack_into(slots, index * SLOT.size, key, data_offset + len(data))
+        data += RECORD.pack(len(encoded_code), len(encoded_url), expires_at) + encoded_code + encoded_url
+
+    header = HEADER.pack(MAGIC, VERSION, slot_count, len(records), slots_offset, data_offset).ljust(HEADER_SIZE, b"\0")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(slots)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def acquire_builder_lock(path: str):
+    """
+    Tries to become the one process that rebuilds the table at `path`. Returns the
+    open lock file, which holds the lock until it is closed or the process exits,
+    or None if another process holds it or locking is unavailable.
+    """
+    if fcntl is None:
+        return None
+    f = open(f"{path}.lock", "a+b")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class RedirectTable:
+    """
+    Read-mostly short_code -> original_url table shared by all workers through mmap.
+
+    The file is an open-addressing hash of 16-byte slots pointing into a packed
+    region of URL records. Every worker maps the same file MAP_SHARED, so the pages
+    live once in the OS page cache no matter how many workers there are, and a
+    lookup is a few struct reads against the mapping. Deleting a link overwrites
+    its slot hash with a tombstone in place, which every worker sees at once.
+    Each record carries its expiry time, so an expired link stops resolving
+    before the sweeper has removed it. A rebuilt file is picked up by `refresh()`.
+    The entry count in the header is decremented in place by `remove()`, so
+    `entries` tracks live links across all workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._identity = None
+        self._mask = 0
+        self._slots_offset = 0
+        self.refresh()
+
+    @property
+    def entries(self) -> int:
+        return ENTRY_COUNT.unpack_from(self._map, ENTRY_COUNT_OFFSET)[0] if self._map is not None else 0
+
+    def refresh(self) -> bool:
+        """Maps the file again if it was replaced since the last call. Returns True if it changed."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return False
+
+        f = open(self.path, "r+b")
+        try:
+            mapping = mmap.mmap(f.fileno(), 0)
+        except (ValueError, OSError):
+            f.close()
+            return False
+        magic, version, slot_count, _, slots_offset, _ = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            mapping.close()
+            f.close()
+            raise ValueError(f"{self.path} is not a redirect table")
+
+        self.close()
+        self._file, self._map, self._identity = f, mapping, identity
+        self._mask, self._slots_offset = slot_count - 1, slots_offset
+        return True
+
+    def _find_slot(self, encoded_code: bytes) -> Tuple[int, int]:
+        """Returns (slot position, record offset) for a code, or (-1, 0) if absent."""
+        mapping, mask, slots_offset = self._map, self._mask, self._slots_offset
+        key = code_hash(encoded_code)
+        index = key & mask
+        for _ in range(mask + 1):
+            position = slots_offset + index * SLOT.size
+            slot_key, offset = SLOT.unpack_from(mapping, position)
+            if slot_key == EMPTY:
+                return -1, 0
+            if slot_key == key:
+                code_length, _, _ = RECORD.unpack_from(mapping, offset)
+                start = offset + RECORD.size
+                if mapping[start:start + code_length] == encoded_code:
+                    return position, offset
+            index = (index + 1) & mask
+        return -1, 0
+
+    def get(self, short_code: str) -> Optional[str]:
+        """Returns the URL for a code, or None if it is absent or has expired."""
+        if self._map is None:
+            return None
+        _, offset = self._find_slot(short_code.encode())
+        if not offset:
+            return None
+        code_length, url_length, expires_at = RECORD.unpack_from(self._map, offset)
+        if expires_at and expires_at <= time.time():
+            return None
+        start = offset + RECORD.size + code_length
+        return self._map[start:start + url_length].decode()
+
+    def remove(self, short_code: str) -> bool:
+        """Tombstones a code in the shared mapping so no worker serves it any more."""
+        if self._map is None:
+            return False
+        position, _ = self._find_slot(short_code.encode())
+        if position < 0:
+            return False
+        SLOT.pack_into(self._map, position, TOMBSTONE, 0)
+        # Not atomic across processes; two workers removing at the same instant may lose one decrement
+        entries = ENTRY_COUNT.unpack_from(self._map, ENTRY_COUNT_OFFSET)[0]
+        ENTRY_COUNT.pack_into(self._map, ENTRY_COUNT_OFFSET, max(entries - 1, 0))
+        return True
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = self._identity = None
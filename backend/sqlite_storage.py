@@ -0,0 +1,188 @@
+import asyncio
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from storage import PageKey
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS short_urls (
+    short_code   TEXT PRIMARY KEY,
+    original_url TEXT NOT NULL,
+    user_id      TEXT,
+    clicks       INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT NOT NULL,
+    url_hash     TEXT,
+    expires_at   INTEGER
+) WITHOUT ROWID;
+DROP INDEX IF EXISTS idx_short_urls_user_id;
+CREATE INDEX IF NOT EXISTS idx_short_urls_user_created
+    ON short_urls (user_id, created_at DESC, short_code DESC);
+CREATE INDEX IF NOT EXISTS idx_short_urls_user_url_hash ON short_urls (user_id, url_hash);
+CREATE INDEX IF NOT EXISTS idx_short_urls_expires ON short_urls (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    next INTEGER NOT NULL
+);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement cache
+# compiles each one once and reuses the prepared statement afterwards.
+COLUMNS = "short_code, original_url, user_id, clicks, created_at, url_hash, expires_at"
+SQL_INSERT = (f"INSERT INTO short_urls ({COLUMNS}) "
+              "VALUES (:short_code, :original_url, :user_id, :clicks, :created_at, :url_hash, :expires_at)")
+SQL_GET = f"SELECT {COLUMNS} FROM short_urls WHERE short_code = ?"
+SQL_LIST_BY_USER = (f"SELECT {COLUMNS} FROM short_urls WHERE user_id = ? "
+                    "ORDER BY created_at DESC, short_code DESC LIMIT ?")
+SQL_LIST_BY_USER_AFTER = (f"SELECT {COLUMNS} FROM short_urls WHERE user_id = ? AND (created_at, short_code) < (?, ?) "
+                          "ORDER BY created_at DESC, short_code DESC LIMIT ?")
+SQL_LIST_ALL = f"SELECT {COLUMNS} FROM short_urls ORDER BY short_code LIMIT ?"
+SQL_LIST_ALL_AFTER = f"SELECT {COLUMNS} FROM short_urls WHERE short_code > ? ORDER BY short_code LIMIT ?"
+SQL_FIND_BY_URL_HASH = f"SELECT {COLUMNS} FROM short_urls WHERE user_id = ? AND url_hash = ? LIMIT 1"
+SQL_INCREMENT = "UPDATE short_urls SET clicks = clicks + ? WHERE short_code = ?"
+SQL_DELETE = "DELETE FROM short_urls WHERE short_code = ?"
+SQL_EXPIRED = ("SELECT short_code FROM short_urls WHERE expires_at IS NOT NULL AND expires_at <= ? "
+               "ORDER BY expires_at LIMIT ?")
+SQL_COUNTER_INIT = "INSERT OR IGNORE INTO counters (name, next) VALUES (?, 0)"
+SQL_COUNTER_GET = "SELECT next FROM counters WHERE name = ?"
+SQL_COUNTER_ADVANCE = "UPDATE counters SET next = next + ? WHERE name = ?"
+
+
+class SqliteStorage:
+    """
+    Storage implementation for a single node, backed by a local SQLite file.
+
+    The database runs in WAL mode so readers never block behind the writer.
+    short_urls is clustered on its short_code primary key, and a
+    (user_id, created_at, short_code) index serves per-user listings. Reads are
+    issued directly on the event loop thread: point lookups against the page cache
+    take microseconds, which is cheaper than a hop to a worker thread. Writes can
+    wait up to busy_timeout for another worker's write lock, so they go through a
+    second connection on a worker thread via asyncio.to_thread, one at a time.
+    """
+
+    def __init__(self, path: str = "shortly.db"):
+        self.path = path
+        self.write_conn = self._connect()
+        self.write_conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.write_conn.executescript(SCHEMA)
+        self._write_lock = threading.Lock()
+        self.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        # With WAL, NORMAL only fsyncs at checkpoints and remains corruption-safe
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _migrate(self):
+        """Brings databases created by older versions up to the current schema."""
+        columns = {row["name"] for row in self.write_conn.execute("PRAGMA table_info(short_urls)")}
+        if columns and "url_hash" not in columns:
+            self.write_conn.execute("ALTER TABLE short_urls ADD COLUMN url_hash TEXT")
+        if columns and "expires_at" not in columns:
+            self.write_conn.execute("ALTER TABLE short_urls ADD COLUMN expires_at INTEGER")
+
+    async def _write(self, fn, *args):
+        """Runs fn(write_conn, *args) on a worker thread, serialized with the other writes."""
+        def run():
+            with self._write_lock:
+                return fn(self.write_conn, *args)
+        return await asyncio.to_thread(run)
+
+    @staticmethod
+    def _create(conn: sqlite3.Connection, record: dict) -> bool:
+        try:
+            conn.execute(SQL_INSERT, record)
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    async def create(self, record: dict) -> bool:
+        return await self._write(self._create, record)
+
+    @staticmethod
+    def _create_many(conn: sqlite3.Connection, records: List[dict]) -> List[bool]:
+        # One transaction for the whole batch; a duplicate code only fails its own INSERT
+        created = []
+        with conn:
+            conn.execute("BEGIN")
+            for record in records:
+                try:
+                    conn.execute(SQL_INSERT, record)
+                    created.append(True)
+                except sqlite3.IntegrityError:
+                    created.append(False)
+        return created
+
+    async def create_many(self, records: List[dict]) -> List[bool]:
+        return await self._write(self._create_many, records)
+
+    async def get(self, short_code: str) -> Optional[dict]:
+        row = self.conn.execute(SQL_GET, (short_code,)).fetchone()
+        return dict(row) if row else None
+
+    async def list_by_user(self, user_id: str, limit: int, after: Optional[PageKey] = None) -> List[dict]:
+        # Keyset pagination on (user_id, created_at, short_code): one index seek per page
+        if after is None:
+            rows = self.conn.execute(SQL_LIST_BY_USER, (user_id, limit))
+        else:
+            rows = self.conn.execute(SQL_LIST_BY_USER_AFTER, (user_id, after[0], after[1], limit))
+        return [dict(row) for row in rows]
+
+    async def list_all(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        if after is None:
+            rows = self.conn.execute(SQL_LIST_ALL, (limit,))
+        else:
+            rows = self.conn.execute(SQL_LIST_ALL_AFTER, (after, limit))
+        return [dict(row) for row in rows]
+
+    async def find_by_url_hash(self, user_id: str, url_hash: str) -> Optional[dict]:
+        row = self.conn.execute(SQL_FIND_BY_URL_HASH, (user_id, url_hash)).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _increment_clicks(conn: sqlite3.Connection, deltas: list):
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(SQL_INCREMENT, deltas)
+
+    async def increment_clicks(self, counts: Dict[str, int]):
+        await self._write(self._increment_clicks, [(count, code) for code, count in counts.items()])
+        counts.clear()
+
+    async def delete(self, short_code: str):
+        await self._write(lambda conn: conn.execute(SQL_DELETE, (short_code,)))
+
+    @staticmethod
+    def _delete_expired(conn: sqlite3.Connection, now: int, limit: int) -> List[str]:
+        # Range scan over the partial expires_at index, which only holds links that can expire
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            codes = [row[0] for row in conn.execute(SQL_EXPIRED, (now, limit))]
+            conn.executemany(SQL_DELETE, [(code,) for code in codes])
+        return codes
+
+    async def delete_expired(self, now: int, limit: int) -> List[str]:
+        return await self._write(self._delete_expired, now, limit)
+
+    @staticmethod
+    def _lease_ids(conn: sqlite3.Connection, count: int) -> int:
+        # BEGIN IMMEDIATE takes the write lock up front, so workers sharing the file serialize here
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(SQL_COUNTER_INIT, ("short_codes",))
+            start = conn.execute(SQL_COUNTER_GET, ("short_codes",)).fetchone()[0]
+            conn.execute(SQL_COUNTER_ADVANCE, (count, "short_codes"))
+        return start
+
+    async def lease_ids(self, count: int) -> int:
+        return await self._write(self._lease_ids, count)
+
+    async def close(self):
+        self.conn.close()
+        with self._write_lock:
+            self.write_conn.close()
@@ -0,0 +1,102 @@
+import base64
+import json
+from typing import AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+# Position in a user's listing: (created_at, short_code) of the last row already returned
+PageKey = Tuple[str, str]
+
+
+class PartialWriteError(Exception):
+    """
+    Raised by create_many when a write fails after part of the batch was committed.
+    `created` holds the results of the records before the failed one; the rest were not written.
+    """
+
+    def __init__(self, created: List[bool], error: Exception):
+        super().__init__(str(error))
+        self.created = created
+
+
+class Storage(Protocol):
+    """
+    Async persistence interface used by the URL endpoints.
+
+    Link records are plain dicts with the keys short_code, original_url, user_id,
+    clicks, created_at (ISO 8601 string), url_hash (hash of the normalized URL) and
+    expires_at (Unix seconds, or None for links that never expire), as stored in
+    the short_urls collection.
+    """
+
+    async def create(self, record: dict) -> bool:
+        """Writes a new link. Returns False if the short code is already taken."""
+        ...
+
+    async def create_many(self, records: List[dict]) -> List[bool]:
+        """
+        Writes links in bulk. Returns, per record, whether it was created (False if the code is taken).
+        Raises PartialWriteError if a failure leaves only a prefix of the records written.
+        """
+        ...
+
+    async def get(self, short_code: str) -> Optional[dict]:
+        ...
+
+    async def list_by_user(self, user_id: str, limit: int, after: Optional[PageKey] = None) -> List[dict]:
+        """Returns up to `limit` of the user's links, newest first, strictly after `after`."""
+        ...
+
+    async def list_all(self, limit: int, after: Optional[str] = None) -> List[dict]:
+        """Returns up to `limit` links of all users ordered by short_code, strictly after `after`."""
+        ...
+
+    async def find_by_url_hash(self, user_id: str, url_hash: str) -> Optional[dict]:
+        """Returns one of the user's links whose normalized URL has this hash, if any."""
+        ...
+
+    async def increment_clicks(self, counts: Dict[str, int]) -> None:
+        """Applies click deltas atomically, popping each code from `counts` once written."""
+        ...
+
+    async def delete(self, short_code: str) -> None:
+        ...
+
+    async def delete_expired(self, now: int, limit: int) -> List[str]:
+        """Deletes up to `limit` links whose expires_at is at or before `now`. Returns their codes."""
+        ...
+
+    async def lease_ids(self, count: int) -> int:
+        """Atomically reserves `count` consecutive ids and returns the first one."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+async def iter_by_user(storage: Storage, user_id: str, page_size: int = 500) -> AsyncIterator[List[dict]]:
+    """Yields all of a user's links page by page, holding only one page in memory."""
+    after = None
+    while True:
+        rows = await storage.list_by_user(user_id, page_size, after)
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["short_code"])
+
+
+def encode_cursor(record: dict) -> str:
+    """Builds an opaque pagination cursor pointing just past `record`."""
+    raw = json.dumps([record["created_at"], record["short_code"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> PageKey:
+    """Parses a cursor produced by encode_cursor(). Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, short_code = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if not isinstance(created_at, str) or not isinstance(short_code, str):
+        raise ValueError("Invalid cursor.")
+    return created_at, short_code
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
+import os
+import sys
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
 
+from link_record import LinkRecord
+from log_store import LogStore
+
+# Lifetimes are parsed exactly as the real backend does, so both servers accept the same values
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from expiration import parse_expiration  # noqa: E402
+
 app = FastAPI()
 
 app.add_middleware(
@@ -27,8 +37,13 @@ class ShortUrlResponse(BaseModel):
     created_at: str
     short_code: str
 
-# In-memory storage for testing
-urls_db = {}
+# Storage for testing: an in-memory index backed by an append-only log so links survive restarts.
+# Expired links are deleted by the store's background sweep
+urls_db = LogStore(os.environ.get("URLS_DB_PATH", "urls.log"))
+
+@app.on_event("shutdown")
+def close_urls_db():
+    urls_db.close()
 
 @app.post("/api/shorten", response_model=ShortUrlResponse)
 async def create_short_url(request: CreateShortUrlRequest):
@@ -43,15 +58,25 @@ async def create_short_url(request: CreateShortUrlRequest):
     else:
         short_code = str(uuid.uuid4())[:8]
 
+    try:
+        lifetime = parse_expiration(request.expiration)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # Store in memory
-    urls_db[short_code] = {
-        "original_url": request.original_url,
-        "alias": request.alias,
-        "expiration": request.expiration,
-        "user_id": request.user_id,
-        "created_at": datetime.datetime.now().isoformat(),
-        "clicks": 0
-    }
+    created_at = datetime.datetime.now()
+    try:
+        urls_db[short_code] = LinkRecord(
+            original_url=request.original_url,
+            alias=request.alias,
+            expiration=request.expiration,
+            user_id=request.user_id,
+            created_at=int(created_at.timestamp() * 1_000_000),
+            expires_at=int(created_at.timestamp()) + lifetime if lifetime is not None else None,
+        )
+    except ValueError as e:
+        # A field or the alias too long for the packed record
+        raise HTTPException(status_code=400, detail=str(e))
 
     short_url = f"http://localhost:8000/{short_code}"
 
@@ -60,13 +85,19 @@ async def create_short_url(request: CreateShortUrlRequest):
         original_url=request.original_url,
         alias=request.alias,
         expiration=request.expiration,
-        created_at=datetime.datetime.now().isoformat(),
+        created_at=created_at.isoformat(),
         short_code=short_code
     )
 
 @app.get("/api/urls/{user_id}")
-async def get_user_urls(user_id: str):
-    user_urls = [{"id": k, **v} for k, v in urls_db.items() if v.get("user_id") == user_id]
+async def get_user_urls(user_id: str, limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0)):
+    # Served from the user_id index, so the cost follows this user's link count, not the whole store
+    codes = urls_db.keys_for_user(user_id, limit, offset)
+    user_urls = []
+    for code in codes:
+        record = urls_db.get(code)
+        if record is not None:
+            user_urls.append({"id": code, **record.to_dict()})
     return user_urls
 
 if __name__ == "__main__":
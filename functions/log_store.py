@@ -0,0 +1,326 @@
+import heapq
+import os
+import struct
+import threading
+import time
+import zlib
+from itertools import accumulate, islice
+from typing import Iterator, List, Optional, Tuple
+
+from link_record import LinkRecord
+
+# A log is a sequence of blocks, one per fsync batch. Block header: crc32 of everything after it,
+# body length, record count. The body holds every record's op byte, then every key length (u8),
+# then every value length (u32), then all keys and finally all values, so recovery can slice a
+# whole block at once instead of parsing one record at a time.
+BLOCK_HEADER = struct.Struct("<III")
+# Per-record overhead inside a block: op, key length and value length
+RECORD_OVERHEAD = 6
+OP_PUT = 1
+OP_DELETE = 2
+# Records per block when compaction rewrites the log
+COMPACT_BLOCK_RECORDS = 10_000
+
+
+def encode_block(records) -> bytes:
+    """Frames a list of (op, key, value) byte records as one checksummed block."""
+    count = len(records)
+    body = b"".join((
+        bytes(op for op, _, _ in records),
+        bytes(len(key) for _, key, _ in records),
+        struct.pack(f"<{count}I", *(len(value) for _, _, value in records)),
+        b"".join(key for _, key, _ in records),
+        b"".join(value for _, _, value in records),
+    ))
+    tail = struct.pack("<II", len(body), count) + body
+    return struct.pack("<I", zlib.crc32(tail)) + tail
+
+
+class LogStore:
+    """
+    Embedded log-structured key/value store for the in-memory test server.
+
+    Every write updates an in-memory index of key -> packed LinkRecord, so reads
+    never touch the disk, and queues the same bytes for the log. Records are
+    unpacked only when they are read. Pending records are written as one checksummed block
+    with a single fsync, either every `sync_interval` seconds or once `sync_every`
+    records are pending, by a background thread; a crash loses at most that
+    window, and a torn final block fails its checksum and is cut off during
+    recovery. When dead records make up most of the file, it is compacted into a
+    fresh log holding only live keys. Neither the fsync nor the rewrite holds the
+    index lock, so writes keep going while they run.
+
+    A secondary user_id -> keys index, in creation order, is built during recovery
+    and kept up to date by every put and delete, so a listing never scans the store.
+
+    Records with an expires_at are deleted by the background thread once it has
+    passed, every `expire_interval` seconds. Deadlines sit in a min-heap of
+    (expires_at, key), built during recovery, so a sweep only touches due keys.
+    """
+
+    def __init__(self, path: str, sync_interval: float = 0.05, sync_every: int = 1000,
+                 compact_ratio: float = 2.0, compact_min_bytes: int = 4 * 1024 * 1024,
+                 expire_interval: float = 1.0):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.sync_every = sync_every
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.expire_interval = expire_interval
+
+        # Keys are stored encoded, exactly as they appear in the log
+        self._index = {}
+        # user_id -> {encoded key: None}, an insertion-ordered set
+        self._by_user = {}
+        # (expires_at, encoded key) min-heap. Entries whose key was deleted or rewritten since
+        # are skipped when they come due
+        self._expiring = []
+        self._live_bytes = 0
+        self._log_bytes = 0
+        self._pending = []
+        # _lock guards the index and pending list; _io_lock serializes writes to the log file
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._recover()
+        self._file = open(self.path, "ab")
+        self._thread = threading.Thread(target=self._run, name="log-store-sync", daemon=True)
+        self._thread.start()
+
+    # ---- Recovery ----
+    def _recover(self):
+        """Rebuilds the indexes by replaying the log, truncating a torn or corrupt tail."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        index = self._index
+        view = memoryview(data)
+        header_size = BLOCK_HEADER.size
+        position = 0
+        end = len(data)
+        while position + header_size <= end:
+            crc, body_length, count = BLOCK_HEADER.unpack_from(data, position)
+            body_start = position + header_size
+            block_end = body_start + body_length
+            if block_end > end or zlib.crc32(view[position + 4:block_end]) != crc:
+                break
+
+            ops = data[body_start:body_start + count]
+            key_ends = list(accumulate(data[body_start + count:body_start + 2 * count],
+                                       initial=body_start + 6 * count))
+            value_ends = list(accumulate(struct.unpack_from(f"<{count}I", data, body_start + 2 * count),
+                                         initial=key_ends[-1]))
+            keys = [data[start:stop] for start, stop in zip(key_ends, key_ends[1:])]
+            values = [data[start:stop] for start, stop in zip(value_ends, value_ends[1:])]
+            if OP_DELETE in ops:
+                for op, key, value in zip(ops, keys, values):
+                    if op == OP_PUT:
+                        index[key] = value
+                    else:
+                        index.pop(key, None)
+            else:
+                index.update(zip(keys, values))
+            position = block_end
+
+        if position < end:
+            print(f"LogStore: discarding {end - position} bytes of incomplete log tail in {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(position)
+                f.flush()
+                os.fsync(f.fileno())
+        # Group by the encoded user_id and decode each distinct one once
+        by_user = {}
+        for key, user_id in zip(index, LinkRecord.packed_user_ids(index.values())):
+            keys = by_user.get(user_id)
+            if keys is None:
+                keys = by_user[user_id] = {}
+            keys[key] = None
+        self._by_user = {user_id.decode() if user_id is not None else None: keys
+                         for user_id, keys in by_user.items()}
+        expiring = [(expires_at, key)
+                    for key, expires_at in zip(index, map(LinkRecord.packed_expires_at, index.values()))
+                    if expires_at is not None]
+        heapq.heapify(expiring)
+        self._expiring = expiring
+        self._live_bytes = sum(map(len, index)) + sum(map(len, index.values())) + RECORD_OVERHEAD * len(index)
+        self._log_bytes = position
+
+    # ---- Writes ----
+    def _append(self, op: int, key: bytes, value: bytes = b""):
+        self._pending.append((op, key, value))
+        self._log_bytes += RECORD_OVERHEAD + len(key) + len(value)
+        if len(self._pending) >= self.sync_every:
+            self._wakeup.set()
+
+    def put(self, key: str, record: LinkRecord):
+        encoded_key = key.encode()
+        if len(encoded_key) > 255:
+            raise ValueError("Key is longer than 255 bytes.")
+        value = record.pack()
+        with self._lock:
+            previous = self._index.get(encoded_key)
+            if previous is not None:
+                self._live_bytes -= RECORD_OVERHEAD + len(encoded_key) + len(previous)
+            self._index[encoded_key] = value
+            self._live_bytes += RECORD_OVERHEAD + len(encoded_key) + len(value)
+            user_id = record.user_id
+            if previous is not None and LinkRecord.packed_user_id(previous) != user_id:
+                self._unindex_user(LinkRecord.packed_user_id(previous), encoded_key)
+            self._by_user.setdefault(user_id, {})[encoded_key] = None
+            if record.expires_at is not None:
+                heapq.heappush(self._expiring, (record.expires_at, encoded_key))
+            self._append(OP_PUT, encoded_key, value)
+
+    def delete(self, key: str) -> bool:
+        encoded_key = key.encode()
+        with self._lock:
+            previous = self._index.pop(encoded_key, None)
+            if previous is None:
+                return False
+            self._live_bytes -= RECORD_OVERHEAD + len(encoded_key) + len(previous)
+            self._unindex_user(LinkRecord.packed_user_id(previous), encoded_key)
+            self._append(OP_DELETE, encoded_key)
+            return True
+
+    # ---- user_id index ----
+    def _unindex_user(self, user_id: Optional[str], encoded_key: bytes):
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.pop(encoded_key, None)
+            if not keys:
+                del self._by_user[user_id]
+
+    def keys_for_user(self, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """Returns a user's keys in creation order, skipping `offset` and returning at most `limit`."""
+        with self._lock:
+            keys = self._by_user.get(user_id, {})
+            stop = None if limit is None else offset + limit
+            return [key.decode() for key in islice(keys, offset, stop)]
+
+    # ---- Expiry ----
+    def delete_expired(self, now: int) -> List[str]:
+        """Deletes every record whose expires_at is at or before `now`. Returns their keys."""
+        expired = []
+        with self._lock:
+            heap = self._expiring
+            while heap and heap[0][0] <= now:
+                expires_at, encoded_key = heapq.heappop(heap)
+                value = self._index.get(encoded_key)
+                if value is not None and LinkRecord.packed_expires_at(value) == expires_at:
+                    # Through delete, so the user index and the log see it like any other removal
+                    key = encoded_key.decode()
+                    self.delete(key)
+                    expired.append(key)
+        return expired
+
+    # ---- Reads ----
+    def get(self, key: str) -> Optional[LinkRecord]:
+        value = self._index.get(key.encode())
+        return LinkRecord.unpack(value) if value is not None else None
+
+    def __contains__(self, key: str) -> bool:
+        return key.encode() in self._index
+
+    def __getitem__(self, key: str) -> LinkRecord:
+        return LinkRecord.unpack(self._index[key.encode()])
+
+    def __setitem__(self, key: str, record: LinkRecord):
+        self.put(key, record)
+
+    def __delitem__(self, key: str):
+        if not self.delete(key):
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self):
+        return [key.decode() for key in list(self._index)]
+
+    def items(self) -> Iterator[Tuple[str, LinkRecord]]:
+        for key, value in list(self._index.items()):
+            yield key.decode(), LinkRecord.unpack(value)
+
+    def values(self) -> Iterator[LinkRecord]:
+        for value in list(self._index.values()):
+            yield LinkRecord.unpack(value)
+
+    # ---- Durability and compaction ----
+    def _take_pending(self) -> list:
+        """Detaches the pending records; called with _lock held."""
+        pending = self._pending
+        if pending:
+            self._pending = []
+            self._log_bytes += BLOCK_HEADER.size
+        return pending
+
+    def _write_block(self, records: list):
+        """Appends records to the log as one block and fsyncs it; called with _io_lock held."""
+        if records:
+            self._file.write(encode_block(records))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def sync(self):
+        """Writes every pending record as one block and fsyncs it."""
+        # Writers only wait for the swap; the write and fsync happen under the I/O lock alone
+        with self._io_lock:
+            with self._lock:
+                pending = self._take_pending()
+            self._write_block(pending)
+
+    def needs_compaction(self) -> bool:
+        return self._log_bytes >= self.compact_min_bytes and self._log_bytes > self._live_bytes * self.compact_ratio
+
+    def compact(self):
+        """Rewrites the log with only the live records and swaps it in atomically."""
+        with self._io_lock:
+            # Snapshot the index together with the pending records it already reflects, then
+            # rewrite without blocking writers; their records stay pending and follow the new log
+            with self._lock:
+                pending = self._take_pending()
+                live = list(self._index.items())
+            self._write_block(pending)
+            tmp_path = f"{self.path}.compact"
+            with open(tmp_path, "wb") as f:
+                for start in range(0, len(live), COMPACT_BLOCK_RECORDS):
+                    f.write(encode_block([(OP_PUT, key, value)
+                                          for key, value in live[start:start + COMPACT_BLOCK_RECORDS]]))
+                f.flush()
+                os.fsync(f.fileno())
+                compacted_bytes = f.tell()
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+            with self._lock:
+                self._log_bytes = compacted_bytes + sum(RECORD_OVERHEAD + len(key) + len(value)
+                                                        for _, key, value in self._pending)
+
+    def _run(self):
+        next_expiry = time.monotonic()
+        while not self._closed:
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+            try:
+                if time.monotonic() >= next_expiry:
+                    next_expiry = time.monotonic() + self.expire_interval
+                    self.delete_expired(int(time.time()))
+                self.sync()
+                if self.needs_compaction():
+                    self.compact()
+            except Exception as e:
+                print(f"LogStore: background sync failed: {e}")
+
+    def close(self):
+        """Stops the background thread and makes every write durable."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.sync()
+        self._file.close()
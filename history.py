@@ -1,14 +1,352 @@
 # history.py
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
-    QLineEdit, QMessageBox, QScrollArea, QSizePolicy, QApplication
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame,
+    QLineEdit, QApplication, QProgressBar, QListView, QStyledItemDelegate
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QTimer, QThread, QAbstractListModel, QModelIndex,
+    QRect, QRectF, QSize, QEvent
+)
+from PyQt5.QtGui import QFont, QColor, QPainter, QPen, QFontMetrics
 import firebase_admin
 from firebase_admin import firestore
 import sys
-from datetime import datetime
+from array import array
+from bisect import bisect_left
+
+# Links fetched per Firestore query; each page is shown as soon as it arrives
+HISTORY_PAGE_SIZE = 100
+
+# Quiet period after the last keystroke before the search runs (ms)
+SEARCH_DEBOUNCE_MS = 150
+
+
+def fetch_history_page(db, user_id, page_size=HISTORY_PAGE_SIZE, after=None):
+    """
+    Returns (rows, cursor) for one page of the user's history, newest first.
+    Served by the (user_id, created_at desc) index in firestore.indexes.json;
+    pass the returned cursor as `after` to get the next page (None after the last).
+    """
+    query = (db.collection('url_history')
+             .where('user_id', '==', user_id)
+             .order_by('created_at', direction=firestore.Query.DESCENDING)
+             .limit(page_size))
+    if after is not None:
+        query = query.start_after(after)
+
+    docs = list(query.stream())
+    rows = []
+    for doc in docs:
+        data = doc.to_dict()
+        rows.append({
+            'id': doc.id,
+            'original_url': data.get('original_url', 'N/A'),
+            'short_url': data.get('short_url', 'N/A'),
+            'clicks': data.get('clicks', 0),
+            'created_at': data.get('created_at'),
+            'alias': data.get('alias_used', ''),
+            'expires_at': data.get('expires_at'),
+            'is_active': data.get('is_active', True)
+        })
+    cursor = docs[-1] if len(docs) == page_size else None
+    return rows, cursor
+
+
+class HistoryLoadWorker(QThread):
+    """
+    Worker thread that pages through the user's history and emits every page
+    as it arrives. Call cancel() to stop after the query in flight.
+    """
+    # rows, cursor of the next page (None after the last page)
+    batch_loaded = pyqtSignal(list, object)
+    finished_loading = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, user_id, after=None):
+        super().__init__()
+        self.user_id = user_id
+        self.after = after
+
+    def cancel(self):
+        for signal in (self.batch_loaded, self.finished_loading, self.error):
+            signal.disconnect()
+        self.requestInterruption()
+
+    def run(self):
+        try:
+            db = firestore.client()
+            after = self.after
+            while not self.isInterruptionRequested():
+                rows, cursor = fetch_history_page(db, self.user_id, after=after)
+                if self.isInterruptionRequested():
+                    return
+                self.batch_loaded.emit(rows, cursor)
+                if cursor is None:
+                    self.finished_loading.emit()
+                    return
+                after = cursor
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+def format_date(timestamp):
+    """Format timestamp to readable date"""
+    if not timestamp:
+        return "N/A"
+
+    try:
+        if hasattr(timestamp, 'to_datetime'):
+            dt = timestamp.to_datetime()
+        elif hasattr(timestamp, 'strftime'):
+            dt = timestamp
+        else:
+            return "N/A"
+
+        # Format as M/D/YYYY (like in screenshot)
+        return f"{dt.month}/{dt.day}/{dt.year}"
+    except:
+        return "N/A"
+
+
+class SearchIndex:
+    """
+    Substring search over the loaded history rows.
+
+    Each row's searchable text (original URL, short URL and alias) is lowercased
+    once when it is added, and a trigram -> row ids index narrows a query to the
+    rows holding its rarest trigram before the substring check. A query that
+    contains the previous one only re-checks the previous matches, so typing
+    refines the result set instead of rescanning every row.
+    """
+
+    def __init__(self):
+        self.texts = []
+        # trigram -> ids of the rows containing it, in increasing order
+        self.trigrams = {}
+        self.query = None
+        self.matches = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, rows):
+        for row in rows:
+            row_id = len(self.texts)
+            text = "\n".join((row['original_url'], row['short_url'], row.get('alias') or '')).lower()
+            self.texts.append(text)
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                postings = self.trigrams.get(trigram)
+                if postings is None:
+                    postings = self.trigrams[trigram] = array('I')
+                postings.append(row_id)
+
+    def search(self, query):
+        """Returns the ids, in row order, of every row containing `query` (lowercase)."""
+        if self.query and self.query in query:
+            candidates = self.matches
+        else:
+            candidates = self._candidates(query, 0)
+        texts = self.texts
+        self.query = query
+        self.matches = [row_id for row_id in candidates if query in texts[row_id]]
+        return self.matches
+
+    def search_new(self, start):
+        """Matches of the current query among the rows added from id `start` on."""
+        if not self.query:
+            return []
+        texts, query = self.texts, self.query
+        matches = [row_id for row_id in self._candidates(query, start) if query in texts[row_id]]
+        self.matches.extend(matches)
+        return matches
+
+    def clear_query(self):
+        self.query = None
+        self.matches = []
+
+    def _candidates(self, query, start):
+        if len(query) < 3:
+            return range(start, len(self.texts))
+        postings = min((self.trigrams.get(query[i:i + 3], ()) for i in range(len(query) - 2)), key=len)
+        return postings[bisect_left(postings, start):] if start else postings
+
+
+# Role under which HistoryModel returns the whole row dict
+ROW_ROLE = Qt.UserRole
+
+
+class HistoryModel(QAbstractListModel):
+    """List model over the loaded history rows; cards are painted by LinkCardDelegate."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role == Qt.DisplayRole:
+            return row['short_url']
+        if role == Qt.ToolTipRole:
+            return row['original_url']
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+
+class LinkCardDelegate(QStyledItemDelegate):
+    """
+    Paints one history row as a link card, with the same layout and colors as
+    the QFrame cards it replaces, and turns clicks on its Copy and Delete
+    buttons into signals. Nothing is kept per row: geometry is computed from the item rect
+    while painting, so only visible rows cost anything.
+    """
+    copy_requested = pyqtSignal(dict)
+    delete_requested = pyqtSignal(dict)
+
+    CARD_HEIGHT = 140
+    CARD_SPACING = 16
+    PADDING_X = 24
+    PADDING_Y = 20
+    LABEL_WIDTH = 100
+    LINE_HEIGHT = 22
+    BUTTON_SIZE = QSize(120, 36)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.label_font = QFont("Arial", 12, QFont.Bold)
+        self.text_font = QFont("Arial", 12)
+        self.button_font = QFont("Arial", 10)
+        self.button_font.setWeight(QFont.Medium)
+        # (row, "copy" | "delete") under the mouse, for the hover colors
+        self.hovered = None
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.CARD_SPACING)
+
+    def card_rect(self, item_rect):
+        return QRect(item_rect.left(), item_rect.top(), item_rect.width(), self.CARD_HEIGHT)
+
+    def button_rects(self, item_rect):
+        card = self.card_rect(item_rect)
+        top = card.bottom() - self.PADDING_Y - self.BUTTON_SIZE.height() + 1
+        delete_rect = QRect(card.right() - self.PADDING_X - self.BUTTON_SIZE.width() + 1, top,
+                            self.BUTTON_SIZE.width(), self.BUTTON_SIZE.height())
+        copy_rect = delete_rect.translated(-self.BUTTON_SIZE.width() - 10, 0)
+        return copy_rect, delete_rect
+
+    def paint(self, painter, option, index):
+        row = index.data(ROW_ROLE)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        card = self.card_rect(option.rect)
+        # Soft shadow under the card
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 10))
+        painter.drawRoundedRect(QRectF(card).translated(0, 2), 12, 12)
+        painter.setPen(QPen(QColor("#E5E7EB"), 1))
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), 12, 12)
+
+        inner = card.adjusted(self.PADDING_X, self.PADDING_Y, -self.PADDING_X, -self.PADDING_Y)
+        text_left = inner.left() + self.LABEL_WIDTH
+        flags = Qt.AlignLeft | Qt.AlignVCenter
+
+        # Top row: Original URL
+        line = QRect(inner.left(), inner.top(), inner.width(), self.LINE_HEIGHT)
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#374151"))
+        painter.drawText(line, flags, "Original URL:")
+        painter.setFont(self.text_font)
+        painter.setPen(QColor("#6B7280"))
+        url_rect = QRect(text_left, line.top(), inner.right() - text_left, self.LINE_HEIGHT)
+        painter.drawText(url_rect, flags, QFontMetrics(self.text_font).elidedText(
+            row['original_url'], Qt.ElideRight, url_rect.width()))
+
+        # Middle row: Short URL and created date
+        line = line.translated(0, self.LINE_HEIGHT + 12)
+        short_width = inner.width() * 3 // 5
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#374151"))
+        painter.drawText(line, flags, "Short URL:")
+        painter.setPen(QColor("#10C988"))
+        painter.drawText(QRect(text_left, line.top(), short_width - self.LABEL_WIDTH, self.LINE_HEIGHT), flags,
+                         row['short_url'])
+
+        date_rect = QRect(inner.left() + short_width, line.top(), inner.width() - short_width, self.LINE_HEIGHT)
+        painter.setFont(self.text_font)
+        painter.setPen(QColor("#6B7280"))
+        painter.drawText(date_rect, flags, "Created:")
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#374151"))
+        date_offset = QFontMetrics(self.text_font).horizontalAdvance("Created:") + 20
+        painter.drawText(date_rect.adjusted(date_offset, 0, 0, 0), flags, format_date(row['created_at']))
+
+        # Bottom row: Actions
+        copy_rect, delete_rect = self.button_rects(option.rect)
+        self.paint_button(painter, copy_rect, "📋 Copy", "#10C988", "#E8F8F4",
+                          self.hovered == (index.row(), "copy"))
+        self.paint_button(painter, delete_rect, "🗑️ Delete", "#EF4444", "#FEF2F2",
+                          self.hovered == (index.row(), "delete"))
+        painter.restore()
+
+    def paint_button(self, painter, rect, text, color, background, hovered):
+        painter.setPen(QPen(QColor(color), 1))
+        painter.setBrush(QColor(color if hovered else background))
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+        painter.setFont(self.button_font)
+        painter.setPen(QColor("white" if hovered else color))
+        painter.drawText(rect, Qt.AlignCenter, text)
+
+    def button_at(self, item_rect, pos):
+        copy_rect, delete_rect = self.button_rects(item_rect)
+        if copy_rect.contains(pos):
+            return "copy"
+        if delete_rect.contains(pos):
+            return "delete"
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            button = self.button_at(option.rect, event.pos())
+            if button == "copy":
+                self.copy_requested.emit(index.data(ROW_ROLE))
+                return True
+            if button == "delete":
+                self.delete_requested.emit(index.data(ROW_ROLE))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def track_mouse(self, pos):
+        """Updates the hovered button for a mouse position in the view's viewport"""
+        index = self.view.indexAt(pos)
+        button = self.button_at(self.view.visualRect(index), pos) if index.isValid() else None
+        self.set_hovered((index.row(), button) if button else None)
+
+    def set_hovered(self, hovered):
+        if hovered == self.hovered:
+            return
+        self.hovered = hovered
+        self.view.viewport().setCursor(Qt.PointingHandCursor if hovered else Qt.ArrowCursor)
+        self.view.viewport().update()
 
 
 class HistoryPage(QWidget):
@@ -17,6 +355,17 @@ class HistoryPage(QWidget):
     def __init__(self, user_id="test_user_123"):
         super().__init__()
         self.user_id = user_id
+        self.all_rows = []
+        self.search_index = SearchIndex()
+
+        # History loads on a worker thread; it is cancelled while the page is hidden and
+        # resumes from next_cursor when the page is shown again
+        self.loading_worker = None
+        # Every started worker stays referenced here until its thread has finished
+        self.live_workers = []
+        self.next_cursor = None
+        self.fully_loaded = False
+
         self.setup_ui()
         self.load_data()
 
@@ -73,18 +422,66 @@ class HistoryPage(QWidget):
                 outline: none;
             }
         """)
-        self.search_input.textChanged.connect(self.filter_cards)
+        # Filtering waits for a pause in typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_cards)
+        self.search_input.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_input)
         search_layout.addStretch()
 
         main_layout.addWidget(search_frame)
 
-        # Scroll Area for Cards
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
+        # Loading progress: busy bar plus a running count of loaded links
+        self.progress_frame = QFrame()
+        progress_layout = QHBoxLayout(self.progress_frame)
+        progress_layout.setContentsMargins(0, 0, 0, 0)
+        progress_layout.setSpacing(12)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(6)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: none;
+                border-radius: 3px;
+                background-color: #E5E7EB;
+            }
+            QProgressBar::chunk {
+                border-radius: 3px;
+                background-color: #10C988;
+            }
+        """)
+
+        self.progress_label = QLabel("Loading your links...")
+        self.progress_label.setFont(QFont("Arial", 12))
+        self.progress_label.setStyleSheet("color: #6B7280;")
+
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.progress_label)
+        self.progress_frame.setVisible(False)
+
+        main_layout.addWidget(self.progress_frame)
+
+        # Virtualized list: one card is painted per visible row, no widgets per link
+        self.history_model = HistoryModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.history_model)
+        self.card_delegate = LinkCardDelegate(self.list_view)
+        self.card_delegate.copy_requested.connect(lambda row: self.copy_url(row['short_url']))
+        self.card_delegate.delete_requested.connect(lambda row: self.delete_link(row['id'], row['short_url']))
+        self.list_view.setItemDelegate(self.card_delegate)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QListView.NoSelection)
+        self.list_view.setFocusPolicy(Qt.NoFocus)
+        self.list_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.list_view.viewport().installEventFilter(self)
+        self.list_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: white;
             }
@@ -99,15 +496,7 @@ class HistoryPage(QWidget):
                 min-height: 30px;
             }
         """)
-
-        self.cards_container = QWidget()
-        self.cards_layout = QVBoxLayout(self.cards_container)
-        self.cards_layout.setAlignment(Qt.AlignTop)
-        self.cards_layout.setSpacing(16)
-        self.cards_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.scroll_area.setWidget(self.cards_container)
-        main_layout.addWidget(self.scroll_area, 1)
+        main_layout.addWidget(self.list_view, 1)
 
         # Status Label
         self.status_label = QLabel("Loading your links...")
@@ -122,278 +511,132 @@ class HistoryPage(QWidget):
         main_layout.addWidget(self.status_label)
 
     def load_data(self):
-        """Load history data from Firebase"""
-        try:
-            if not firebase_admin._apps:
-                self.status_label.setText("Firebase not initialized")
-                self.status_label.setVisible(True)
-                return
-
-            db = firestore.client()
-
-            # Try to fetch all data and filter locally
-            all_docs = db.collection('url_history').stream()
-
-            rows = []
-            for doc in all_docs:
-                data = doc.to_dict()
-
-                # Filter by user_id locally
-                if data.get('user_id') != self.user_id:
-                    continue
-
-                row = {
-                    'id': doc.id,
-                    'original_url': data.get('original_url', 'N/A'),
-                    'short_url': data.get('short_url', 'N/A'),
-                    'clicks': data.get('clicks', 0),
-                    'created_at': data.get('created_at'),
-                    'alias': data.get('alias_used', ''),
-                    'expires_at': data.get('expires_at'),
-                    'is_active': data.get('is_active', True)
-                }
-                rows.append(row)
-
-            # Sort by created_at locally (newest first)
-            def get_sort_key(row):
-                created = row.get('created_at')
-                if hasattr(created, 'to_datetime'):
-                    return created.to_datetime()
-                elif hasattr(created, 'timestamp'):
-                    return created
-                else:
-                    return datetime.min
-
-            rows.sort(key=get_sort_key, reverse=True)
-
-            self.all_rows = rows
-
-            if not rows:
-                self.status_label.setText("No links yet. Create your first short link!")
-                self.status_label.setVisible(True)
-                self.clear_cards()
-            else:
-                self.status_label.setVisible(False)
-                self.display_cards(rows)
-
-        except Exception as e:
-            error_msg = str(e)
-            self.status_label.setText(f"Error loading data: {error_msg}")
-            self.status_label.setVisible(True)
-            self.clear_cards()
-
-    def clear_cards(self):
-        """Remove all cards from the layout"""
-        while self.cards_layout.count():
-            item = self.cards_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-    def display_cards(self, rows):
-        """Display links as cards"""
+        """Reload history data from Firebase on a worker thread"""
+        self.cancel_loading()
+        self.all_rows = []
+        self.search_index = SearchIndex()
+        search_text = self.search_input.text().lower().strip()
+        if search_text:
+            # Keep an active search applied to the reloaded rows as they arrive
+            self.search_index.search(search_text)
+        self.next_cursor = None
+        self.fully_loaded = False
         self.clear_cards()
 
-        for row in rows:
-            card = self.create_link_card(row)
-            self.cards_layout.addWidget(card)
-
-        # Add stretch at the end
-        self.cards_layout.addStretch()
-
-    def create_link_card(self, row):
-        """Create a single link card"""
-        card = QFrame()
-        card.setObjectName("linkCard")
-        card.setStyleSheet("""
-            QFrame#linkCard {
-                background-color: white;
-                border: 1px solid #E5E7EB;
-                border-radius: 12px;
-                padding: 0px;
-            }
-        """)
-        card.setMinimumHeight(120)
-
-        card_layout = QVBoxLayout(card)
-        card_layout.setContentsMargins(24, 20, 24, 20)
-        card_layout.setSpacing(12)
+        if not firebase_admin._apps:
+            self.status_label.setText("Firebase not initialized")
+            self.status_label.setVisible(True)
+            return
 
-        # Top row: Original URL
-        original_url_frame = QFrame()
-        original_url_layout = QHBoxLayout(original_url_frame)
-        original_url_layout.setContentsMargins(0, 0, 0, 0)
-
-        original_label = QLabel("Original URL:")
-        original_label.setFont(QFont("Arial", 12, QFont.Bold))
-        original_label.setStyleSheet("color: #374151;")
-        original_label.setFixedWidth(100)
-
-        original_url = row['original_url']
-        if len(original_url) > 60:
-            display_url = original_url[:57] + "..."
+        self.status_label.setText("Loading your links...")
+        self.status_label.setVisible(True)
+        self.start_loading()
+
+    def start_loading(self):
+        """Load the remaining pages, starting after next_cursor"""
+        worker = HistoryLoadWorker(self.user_id, self.next_cursor)
+        worker.batch_loaded.connect(self.on_batch_loaded)
+        worker.finished_loading.connect(self.on_loading_finished)
+        worker.error.connect(self.on_loading_error)
+        # Its signals can be handled before run() returns, so self.loading_worker is not what keeps it alive
+        self.live_workers.append(worker)
+        worker.finished.connect(lambda: self.live_workers.remove(worker))
+        self.loading_worker = worker
+        worker.start()
+
+        self.progress_label.setText(f"Loading... {len(self.all_rows)} links")
+        self.progress_frame.setVisible(True)
+
+    def cancel_loading(self):
+        if self.loading_worker is not None:
+            self.loading_worker.cancel()
+            self.loading_worker = None
+        self.progress_frame.setVisible(False)
+
+    def on_batch_loaded(self, rows, cursor):
+        first_batch = not self.all_rows
+        start = len(self.all_rows)
+        self.all_rows.extend(rows)
+        self.search_index.add(rows)
+        self.next_cursor = cursor
+        self.progress_label.setText(f"Loading... {len(self.all_rows)} links")
+
+        if not rows:
+            return
+        if self.search_index.query:
+            # Only the new rows are checked against the active search
+            matches = [self.all_rows[row_id] for row_id in self.search_index.search_new(start)]
+            if matches:
+                self.status_label.setVisible(False)
+                self.append_cards(matches)
+        elif first_batch:
+            self.status_label.setVisible(False)
+            self.display_cards(rows)
         else:
-            display_url = original_url
-
-        original_url_text = QLabel(display_url)
-        original_url_text.setFont(QFont("Arial", 12))
-        original_url_text.setStyleSheet("color: #6B7280;")
-        original_url_text.setWordWrap(True)
-        original_url_text.setToolTip(original_url)
-
-        original_url_layout.addWidget(original_label)
-        original_url_layout.addWidget(original_url_text, 1)
-        card_layout.addWidget(original_url_frame)
-
-        # Middle row: Short URL and Clicks
-        middle_frame = QFrame()
-        middle_layout = QHBoxLayout(middle_frame)
-        middle_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Short URL
-        short_url_frame = QFrame()
-        short_url_layout = QHBoxLayout(short_url_frame)
-        short_url_layout.setContentsMargins(0, 0, 0, 0)
-
-        short_label = QLabel("Short URL:")
-        short_label.setFont(QFont("Arial", 12, QFont.Bold))
-        short_label.setStyleSheet("color: #374151;")
-        short_label.setFixedWidth(100)
-
-        short_url_text = QLabel(row['short_url'])
-        short_url_text.setFont(QFont("Arial", 12))
-        short_url_text.setStyleSheet("color: #10C988; font-weight: bold;")
-        short_url_text.setCursor(Qt.PointingHandCursor)
-
-        short_url_layout.addWidget(short_label)
-        short_url_layout.addWidget(short_url_text, 1)
-        middle_layout.addWidget(short_url_frame, 3)
-
-        # Clicks and Date
-        stats_frame = QFrame()
-        stats_layout = QHBoxLayout(stats_frame)
-        stats_layout.setContentsMargins(0, 0, 0, 0)
-        stats_layout.setSpacing(20)
-
-        # Created Date Only
-        date_label = QLabel("Created:")
-        date_label.setFont(QFont("Arial", 12))
-        date_label.setStyleSheet("color: #6B7280;")
-
-        date_value = QLabel(self.format_date(row['created_at']))
-        date_value.setFont(QFont("Arial", 12, QFont.Bold))
-        date_value.setStyleSheet("color: #374151;")
-
-        stats_layout.addWidget(date_label)
-        stats_layout.addWidget(date_value)
-        stats_layout.addStretch()
-
-        middle_layout.addWidget(stats_frame, 2)
-        card_layout.addWidget(middle_frame)
+            self.append_cards(rows)
+
+    def on_loading_finished(self):
+        self.loading_worker = None
+        self.fully_loaded = True
+        self.progress_frame.setVisible(False)
+        if not self.all_rows:
+            self.status_label.setText("No links yet. Create your first short link!")
+            self.status_label.setVisible(True)
+        elif self.search_index.query and not self.search_index.matches:
+            # A search typed during loading matched none of the batches
+            self.status_label.setText(f"No links found for '{self.search_index.query}'")
+            self.status_label.setVisible(True)
 
-        # Bottom row: Actions
-        actions_frame = QFrame()
-        actions_layout = QHBoxLayout(actions_frame)
-        actions_layout.setContentsMargins(0, 0, 0, 0)
-
-        actions_layout.addStretch()
-
-        # Copy Button
-        copy_btn = QPushButton("📋 Copy")
-        copy_btn.setFixedSize(120, 36)
-        copy_btn.setCursor(Qt.PointingHandCursor)
-        copy_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #E8F8F4;
-                color: #10C988;
-                border: 1px solid #10C988;
-                border-radius: 6px;
-                font-family: Arial;
-                font-size: 13px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #10C988;
-                color: white;
-            }
-        """)
-        copy_btn.clicked.connect(lambda checked, url=row['short_url']: self.copy_url(url))
-
-        # Delete Button
-        delete_btn = QPushButton("🗑️ Delete")
-        delete_btn.setFixedSize(120, 36)
-        delete_btn.setCursor(Qt.PointingHandCursor)
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #FEF2F2;
-                color: #EF4444;
-                border: 1px solid #EF4444;
-                border-radius: 6px;
-                font-family: Arial;
-                font-size: 13px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #EF4444;
-                color: white;
-            }
-        """)
-        delete_btn.clicked.connect(lambda checked, doc_id=row['id'], url=row['short_url']:
-                                   self.delete_link(doc_id, url))
+    def on_loading_error(self, error_msg):
+        self.loading_worker = None
+        self.progress_frame.setVisible(False)
+        self.status_label.setText(f"Error loading data: {error_msg}")
+        self.status_label.setVisible(True)
 
-        actions_layout.addWidget(copy_btn)
-        actions_layout.addSpacing(10)
-        actions_layout.addWidget(delete_btn)
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Pick up where loading stopped when the tab was left
+        if not self.fully_loaded and self.loading_worker is None and firebase_admin._apps:
+            self.start_loading()
 
-        card_layout.addWidget(actions_frame)
+    def hideEvent(self, event):
+        self.cancel_loading()
+        super().hideEvent(event)
 
-        # Add subtle shadow effect
-        from PyQt5.QtWidgets import QGraphicsDropShadowEffect
-        shadow = QGraphicsDropShadowEffect(card)
-        shadow.setBlurRadius(10)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 10))
-        card.setGraphicsEffect(shadow)
+    def clear_cards(self):
+        """Remove all cards from the list"""
+        self.history_model.set_rows([])
 
-        return card
+    def display_cards(self, rows):
+        """Display links as cards"""
+        self.history_model.set_rows(rows)
 
-    def format_date(self, timestamp):
-        """Format timestamp to readable date"""
-        if not timestamp:
-            return "N/A"
+    def append_cards(self, rows):
+        """Add cards for more rows at the end of the list"""
+        self.history_model.append_rows(rows)
 
-        try:
-            if hasattr(timestamp, 'to_datetime'):
-                dt = timestamp.to_datetime()
-            elif hasattr(timestamp, 'strftime'):
-                dt = timestamp
-            else:
-                return "N/A"
-
-            # Format as M/D/YYYY (like in screenshot)
-            return f"{dt.month}/{dt.day}/{dt.year}"
-        except:
-            return "N/A"
+    def eventFilter(self, obj, event):
+        # Item views do not pass mouse moves to their delegate, so button hover is tracked here
+        if obj is self.list_view.viewport():
+            if event.type() == QEvent.MouseMove:
+                self.card_delegate.track_mouse(event.pos())
+            elif event.type() == QEvent.Leave:
+                self.card_delegate.set_hovered(None)
+        return super().eventFilter(obj, event)
 
     def filter_cards(self):
         """Filter cards based on search text"""
         search_text = self.search_input.text().lower().strip()
 
-        if not hasattr(self, 'all_rows'):
-            return
-
         if not search_text:
             # Show all cards
+            self.search_index.clear_query()
             self.display_cards(self.all_rows)
+            if self.all_rows:
+                self.status_label.setVisible(False)
             return
 
-        # Filter rows
-        filtered_rows = []
-        for row in self.all_rows:
-            if (search_text in row['original_url'].lower() or
-                    search_text in row['short_url'].lower() or
-                    search_text in str(row.get('alias', '')).lower()):
-                filtered_rows.append(row)
+        filtered_rows = [self.all_rows[row_id] for row_id in self.search_index.search(search_text)]
 
         if filtered_rows:
             self.display_cards(filtered_rows)
@@ -14,7 +14,7 @@ from settings import SettingsPage
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QFrame,
     QHBoxLayout, QSizePolicy, QScrollArea, QLineEdit, QGraphicsDropShadowEffect,
-    QApplication, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView
+    QApplication, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QStackedWidget
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer, QPoint, QRect, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QColor, QPainter, QPen
@@ -33,6 +33,9 @@ except ImportError:
 # ==================== CONFIGURATION (is.gd / v.gd) ====================
 ISGD_API_ENDPOINT = "https://v.gd/create.php"
 
+# A cached history tab is reloaded when shown after this long without a refresh (ms)
+HISTORY_STALE_AFTER_MS = 5 * 60 * 1000
+
 
 # ======================================================================
 
@@ -559,6 +562,15 @@ class HomeWindow(QMainWindow):
         self.last_created_short_url = ""  # Store the last created URL
         self.current_copy_button = None  # Store reference to current copy button
 
+        # Tab pages are built on first use and kept alive across tab switches
+        self.tab_pages = {}
+        self.history_page = None
+        self.history_stale = False
+        self.history_stale_timer = QTimer(self)
+        self.history_stale_timer.setSingleShot(True)
+        self.history_stale_timer.setInterval(HISTORY_STALE_AFTER_MS)
+        self.history_stale_timer.timeout.connect(self.mark_history_stale)
+
         self.setStyleSheet("""
             QMainWindow { background-color: #F8F8F8; } 
             #headerFrame { background-color: white; border-top: 1px solid #D9D9D9; border-bottom: 1px solid #D9D9D9; } 
@@ -679,8 +691,13 @@ class HomeWindow(QMainWindow):
         self.content_layout.setSpacing(20)
         self.content_layout.setContentsMargins(40, 40, 40, 40)
 
-        main_layout.addWidget(self.scroll_area, 1)
+        # Dashboard is the first page; history and settings are added on first visit
+        self.tab_stack = QStackedWidget()
+        self.tab_stack.addWidget(self.scroll_area)
+        self.tab_pages["dashboard"] = self.scroll_area
+        main_layout.addWidget(self.tab_stack, 1)
 
+        self.load_dashboard_content(show_result=bool(self.last_created_short_url))
         self.switch_tab("dashboard")
 
     def show_notification(self, message, is_success, position="top", duration=3000):
@@ -994,6 +1011,8 @@ class HomeWindow(QMainWindow):
         short_url = result.get('short_url', '')
         self.current_short_url = short_url
         self.last_created_short_url = short_url
+        # The new link is saved to url_history; reload it the next time the tab is shown
+        self.mark_history_stale()
 
         # 1. Load the dashboard content to show the visual success card with the link
         self.load_dashboard_content(show_result=True, short_url=short_url)
@@ -1071,25 +1090,56 @@ class HomeWindow(QMainWindow):
         self.load_content_for_tab(new_tab_name)
 
     def load_content_for_tab(self, tab_name):
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        if tab_name == "dashboard":
-            self.load_dashboard_content(show_result=bool(self.last_created_short_url))
-
-        elif tab_name == "history":
-            history_page = HistoryPage(self.get_current_user_id())
-            self.content_layout.addWidget(history_page)
-
-        elif tab_name == "settings":
-            # SettingsPage now correctly receives self as parent_app
-            settings_page = SettingsPage(parent_app=self, user_id=self.user_id)
-            self.content_layout.addWidget(settings_page, alignment=Qt.AlignHCenter)
-
-        self.content_layout.addStretch(1)
+        page = self.tab_pages.get(tab_name)
+        if page is None:
+            page = self.tab_pages[tab_name] = self.create_tab_page(tab_name)
+            self.tab_stack.addWidget(page)
+        elif tab_name == "history" and self.history_stale:
+            self.refresh_history()
+        self.tab_stack.setCurrentWidget(page)
+
+    def create_tab_page(self, tab_name):
+        """Builds the page for the history or settings tab, with the dashboard's margins."""
+        container = QWidget()
+        container.setObjectName("scrollContent")
+        layout = QVBoxLayout(container)
+        layout.setSpacing(20)
+        layout.setContentsMargins(40, 40, 40, 40)
+
+        if tab_name == "history":
+            self.history_page = HistoryPage(self.get_current_user_id())
+            if hasattr(self.history_page, "refresh_requested"):
+                # A deleted link reloads the page itself, which counts as a fresh load
+                self.history_page.refresh_requested.connect(self.history_stale_timer.start)
+            self.history_stale = False
+            self.history_stale_timer.start()
+            # The history list scrolls itself, so it gets all the height
+            layout.addWidget(self.history_page, 1)
+            return container
+
+        # SettingsPage now correctly receives self as parent_app
+        settings_page = SettingsPage(parent_app=self, user_id=self.user_id)
+        layout.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
+        layout.addWidget(settings_page, alignment=Qt.AlignHCenter)
+        layout.addStretch(1)
+
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll_area.setWidget(container)
+        return scroll_area
+
+    def mark_history_stale(self):
+        self.history_stale = True
+        if self.history_page is not None and self.active_tab == "history":
+            # Visible right now, so refresh in place
+            self.refresh_history()
+
+    def refresh_history(self):
+        self.history_stale = False
+        self.history_stale_timer.start()
+        if hasattr(self.history_page, "load_data"):
+            self.history_page.load_data()
 
     def load_dashboard_content(self, show_result=False, short_url=None):
         while self.content_layout.count():